@@ -1,9 +1,13 @@
 import openai
 import os
+import threading
+import time
 from colorama import Fore, init
 
 from .ui_utils import Spinner
 from .config_manager import load_config
+from .rate_limiter import acquire, reconcile
+from .utils import estimate_tokens
 
 # Initialize colorama
 init(autoreset=True)
@@ -33,12 +37,68 @@ def check_api_key():
             return False
     return True
 
-def summarize_diff(user_prompt, system_prompt, model=None, max_tokens=None):
-    """Generate a commit message using the OpenAI API, using configured model and tokens."""
+def usage_stats(response, model, latency):
+    """Extract token usage and latency from a chat completion response."""
+    usage = getattr(response, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        "model": model,
+        "latency": round(latency, 3),
+        "prompt_tokens": getattr(usage, 'prompt_tokens', 0) or 0,
+        "completion_tokens": getattr(usage, 'completion_tokens', 0) or 0,
+        "total_tokens": getattr(usage, 'total_tokens', 0) or 0,
+        "cached_tokens": getattr(details, 'cached_tokens', 0) or 0
+    }
+
+def merge_usage(total, usage):
+    """Add one call's token usage and rate-limit wait to a running total."""
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens", "rate_limit_wait"):
+        total[key] = round(total.get(key, 0) + usage.get(key, 0), 3)
+
+def create_completion(model, system_prompt, user_prompt, max_tokens, stats=None, on_wait=None,
+                      response_format=None):
+    """Send one chat completion through the shared rate limiter and record usage in stats."""
+    config = load_config()
+    rpm, tpm = config['rate_limit_rpm'], config['rate_limit_tpm']
+    estimated = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+    waited = acquire(estimated, rpm, tpm, on_wait=on_wait)
+
+    started = time.monotonic()
+    response = client.chat.completions.create(  # type: ignore
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=max_tokens,
+        **({"response_format": response_format} if response_format else {})
+    )
+    usage = usage_stats(response, model, time.monotonic() - started)
+    reconcile(estimated, usage["total_tokens"], tpm)
+    if stats is not None:
+        stats.update(usage)
+        stats["rate_limit_wait"] = round(waited, 3)
+    return response
+
+def summarize_diff(user_prompt, system_prompt, model=None, max_tokens=None, show_spinner=True, stats=None,
+                   response_format=None, errors=None, validate=None):
+    """Generate a commit message using the OpenAI API, using configured model and tokens.
+
+    If a stats dict is given it is filled with the model, latency and token usage.
+    A response_format (e.g. a JSON schema) is passed through to the API; replies
+    that are cut off at max_tokens or rejected by validate count as failures.
+    If an errors list is given, error messages are appended to it instead of printed.
+    """
+    def report(line):
+        if errors is None:
+            print(line)
+        else:
+            errors.append(line)
+
     if not check_api_key():
         return None
 
-    spinner = Spinner("Generating commit message with AI")
+    spinner = Spinner("Generating commit message with AI", enabled=show_spinner)
     spinner.start()
 
     try:
@@ -48,37 +108,88 @@ def summarize_diff(user_prompt, system_prompt, model=None, max_tokens=None):
             model = config['summary_model']
         if max_tokens is None:
             max_tokens = config['summary_max_tokens']
-        response = client.chat.completions.create(  # type: ignore
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens
-        )
-        summary = response.choices[0].message.content
-        spinner.stop(True, "Commit message generated")
+        stats = {} if stats is None else stats
+
+        def on_wait():
+            spinner.message = "Waiting for shared rate limit"
+
+        response = create_completion(model, system_prompt, user_prompt, max_tokens,
+                                     stats=stats, on_wait=on_wait, response_format=response_format)
+        choice = response.choices[0]
+        summary = choice.message.content
+        if not summary:
+            # Structured outputs return a refusal instead of content
+            spinner.stop(False, "The model returned no message")
+            return None
+        if choice.finish_reason == "length":
+            spinner.stop(False, "Reply cut off")
+            report(f"{Fore.RED}✗ The AI reply was cut off at {max_tokens} tokens.")
+            report(f"{Fore.YELLOW}  → Raise --max-tokens or the max_tokens of the routing tier")
+            return None
+        if validate and not validate(summary):
+            spinner.stop(False, "Invalid reply")
+            report(f"{Fore.RED}✗ The AI reply did not match the expected format.")
+            return None
+        if stats["rate_limit_wait"] >= 0.5:
+            spinner.stop(True, f"Commit message generated (waited {stats['rate_limit_wait']:.1f}s for rate limit)")
+        else:
+            spinner.stop(True, "Commit message generated")
         return summary
     except openai.APIConnectionError:
         spinner.stop(False, "Connection error")
-        print(f"{Fore.RED}✗ Unable to connect to the OpenAI API.")
-        print(f"{Fore.YELLOW}  → Please check your network connection")
-        print(f"{Fore.YELLOW}  → Try again or run with '--offline' to manually write your commit")
+        report(f"{Fore.RED}✗ Unable to connect to the OpenAI API.")
+        report(f"{Fore.YELLOW}  → Please check your network connection")
+        report(f"{Fore.YELLOW}  → Try again or run with '--offline' to manually write your commit")
     except openai.AuthenticationError:
         spinner.stop(False, "Authentication error")
-        print(f"{Fore.RED}✗ Authentication failed with OpenAI.")
-        print(f"{Fore.YELLOW}  → Your API key appears to be invalid")
-        print(f"{Fore.YELLOW}  → Run 'gitai-setup' to update your API key")
+        report(f"{Fore.RED}✗ Authentication failed with OpenAI.")
+        report(f"{Fore.YELLOW}  → Your API key appears to be invalid")
+        report(f"{Fore.YELLOW}  → Run 'gitai-setup' to update your API key")
+    except openai.RateLimitError:
+        spinner.stop(False, "Rate limit exceeded")
+        report(f"{Fore.RED}✗ OpenAI rejected the request because of rate limits.")
+        report(f"{Fore.YELLOW}  → Set a shared budget in the [RateLimit] section of the config")
+        report(f"{Fore.YELLOW}  → Run 'gitai-setup' to configure requests and tokens per minute")
     except openai.BadRequestError as e:
         spinner.stop(False, "Invalid request")
-        print(f"{Fore.RED}✗ Bad request to OpenAI API: {e}")
-        print(f"{Fore.YELLOW}  → This might be due to an issue with the request parameters")
+        report(f"{Fore.RED}✗ Bad request to OpenAI API: {e}")
+        report(f"{Fore.YELLOW}  → This might be due to an issue with the request parameters")
     except Exception as e:
         spinner.stop(False, f"An unexpected error occurred: {e}")
-        print(f"{Fore.RED}✗ Unexpected API error: {e}")
+        report(f"{Fore.RED}✗ Unexpected API error: {e}")
     
     return None # Return None on error
 
+class BackgroundSummary:
+    """Run a message generator on a daemon thread so the caller can race it against a deadline.
+
+    generate(stats, errors) returns the message, fills stats with usage and
+    appends error messages to errors instead of printing them.
+    """
+    def __init__(self, generate):
+        self.result = None
+        self.stats = {}
+        self.errors = [] # Printed by the caller; printing here would garble its prompt
+        self._done = threading.Event()
+
+        def run():
+            try:
+                self.result = generate(self.stats, self.errors)
+            finally:
+                self._done.set()
+
+        # Daemon thread: a slow request must not keep the process alive after the user commits
+        self._thread = threading.Thread(target=run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Wait up to timeout seconds; return True if the request has finished."""
+        return self._done.wait(timeout)
+
+    def done(self):
+        return self._done.is_set()
+
 def generate_extended_description(diff_text):
     """Generates a more detailed description based on the diff using a secondary AI call."""
     if not check_api_key():
@@ -100,14 +211,7 @@ def generate_extended_description(diff_text):
         config = load_config()
         model = config.get('description_model')
         max_tokens = config.get('description_max_tokens')
-        response = client.chat.completions.create(  # type: ignore
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens
-        )
+        response = create_completion(model, system_prompt, user_prompt, max_tokens)
         description = response.choices[0].message.content.strip()
         spinner.stop(True, "Extended description generated")
         return description
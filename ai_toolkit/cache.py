@@ -0,0 +1,36 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from .setup import CONFIG_DIR
+
+# Persistent cache location for AI results that never need to be paid for twice
+CACHE_DIR = CONFIG_DIR / "cache"
+
+def _entry_path(namespace, key):
+    """Map a cache key to its JSON file, sharded by the first digest byte."""
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return CACHE_DIR / namespace / digest[:2] / f"{digest}.json"
+
+def cache_get(namespace, key):
+    """Return the cached value for key, or None if missing or unreadable."""
+    path = _entry_path(namespace, key)
+    try:
+        with open(path, encoding='utf-8') as entry:
+            return json.load(entry)
+    except (OSError, ValueError):
+        return None
+
+def cache_put(namespace, key, value):
+    """Store a JSON-serializable value for key; concurrent writers never see partial files."""
+    path = _entry_path(namespace, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as entry:
+            json.dump(value, entry)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
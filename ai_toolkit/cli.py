@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
+import os
 import sys
 import subprocess
+import time
 import re # Import re for push output parsing
 from colorama import Fore, init, Style
 
 # Local imports
 from . import __version__
-from .git_utils import find_git_root, get_repository_context, get_git_changes, stage_specific_files
-from .ai_service import summarize_diff, generate_extended_description, check_api_key
-from .ui_utils import create_box, format_commit_display
-from .utils import parse_commit_message, create_diff_prompt
+from .git_utils import find_git_root, get_repository_context, get_git_changes, stage_specific_files, \
+    get_blob_pairs, git_read_command, pathspec_args, get_index_performance_settings
+from .ai_service import summarize_diff, generate_extended_description, check_api_key, BackgroundSummary, \
+    merge_usage
+from .ui_utils import create_box, format_commit_display, Spinner
+from .utils import parse_commit_message, parse_structured_commit, create_diff_prompt, build_context_from_diff, \
+    split_diff_by_file, COMMIT_RESPONSE_FORMAT
+from .file_notes import get_file_notes, combine_notes, DEFAULT_NOTE_WORKERS
+from .enrichment import collect_enclosing_scopes
+from .heuristics import generate_heuristic_message
+from .range_summary import main as range_main
+from .routing import parse_tiers, route_model
+from .watch import main as watch_main, find_matching_draft
 from .config_manager import load_config
 
 # Initialize colorama
@@ -24,6 +36,10 @@ def create_parser():
     default_model = config['summary_model']
     default_max_tokens = config['summary_max_tokens']
     default_behavior = config.get('default_command_behavior', 'default')
+    default_deadline = config['ai_deadline']
+    default_route = config['routing_enabled']
+    default_incremental = config['incremental_enabled']
+    default_enrich = config['enrichment_enabled']
     # Determine default flags
     initial_stage = default_behavior in ['stage', 'stage_push']
     initial_push = default_behavior == 'stage_push'
@@ -38,6 +54,12 @@ Examples:
   gitai --offline          # Skip AI generation and write manually
   gitai --push             # Automatically push after committing
   gitai --model gpt-4o     # Use a specific OpenAI model
+  gitai --yes --json       # Commit without prompts and print JSON
+  gitai -- services/api    # Only consider changes under a path (monorepos)
+  git diff | gitai --json --diff-file -   # Generate a message for a diff on stdin
+  gitai pr [base]          # Summarize the current branch into a PR description
+  gitai changelog A..B     # Summarize a commit range into grouped release notes
+  gitai watch              # Keep a draft message up to date while you work
 
 Version: {__version__}
 For more information, visit: https://github.com/maximilianlemberg-awl/git-ai-toolkit
@@ -51,15 +73,35 @@ For more information, visit: https://github.com/maximilianlemberg-awl/git-ai-too
                         help=f"Push changes after committing (default: {'on' if initial_push else 'off'})")
     parser.add_argument("--offline", "-o", action="store_true",
                         help="Skip AI generation and craft commit message manually")
+    parser.add_argument("--yes", "-y", action="store_true",
+                        help="Commit the generated message without any prompts")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the result as JSON without prompts; commits only with --yes")
+    parser.add_argument("--allow-fallback", action="store_true",
+                        help="With --yes or --json, use the local draft if AI generation fails instead of exiting 1")
+    parser.add_argument("--diff-file", type=str, metavar="PATH",
+                        help="Generate a message for a diff read from PATH ('-' for stdin) instead of the repository")
 
     # Advanced options
     advanced = parser.add_argument_group("Advanced options")
-    advanced.add_argument("--model", "-m", type=str, default=default_model,
-                        help=f"OpenAI model to use (default: {default_model})")
-    advanced.add_argument("--max-tokens", type=int, default=default_max_tokens,
-                        help=f"Maximum tokens for AI response (default: {default_max_tokens})")
+    advanced.add_argument("--model", "-m", type=str, default=None,
+                        help=f"OpenAI model to use (default: routed by diff size, else {default_model})")
+    advanced.add_argument("--max-tokens", type=int, default=None,
+                        help=f"Maximum tokens for AI response (default: routed by diff size, else {default_max_tokens})")
+    advanced.add_argument("--route", action=argparse.BooleanOptionalAction, default=default_route,
+                        help=f"Pick model and max tokens from the diff's complexity (default: {'on' if default_route else 'off'})")
+    advanced.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=default_incremental,
+                        help=f"For large commits, reuse cached per-file notes and only summarize changed files "
+                             f"(default: {'on' if default_incremental else 'off'})")
+    advanced.add_argument("--enrich", action=argparse.BooleanOptionalAction, default=default_enrich,
+                        help=f"Add the enclosing function or class of each staged hunk to the prompt "
+                             f"(default: {'on' if default_enrich else 'off'})")
+    advanced.add_argument("--deadline", type=float, default=default_deadline,
+                        help=f"Seconds to wait for AI before showing a local draft, 0 to wait (default: {default_deadline:g})")
     advanced.add_argument("--debug", action="store_true",
                         help="Show detailed debug information")
+    parser.add_argument("pathspec", nargs="*", metavar="PATHSPEC",
+                        help="Limit diffs and staging to these paths, e.g. 'gitai -- services/api'")
     parser.add_argument("--version", "-v", action="version", version=f"%(prog)s {__version__}",
                         help="Show version information and exit")
 
@@ -69,7 +111,11 @@ def create_commit_manual(parsed_commit=None):
     """Create a commit message manually, optionally pre-filling from parsed AI suggestion."""
     print("\n" + create_box("Manual Commit Message Edit"))
 
-    initial_subject = parsed_commit['title'] if parsed_commit else ""
+    initial_subject = ""
+    if parsed_commit:
+        initial_subject = parsed_commit['title']
+        if parsed_commit['prefix']:
+            initial_subject = f"{parsed_commit['prefix']}: {initial_subject}"
     initial_body = parsed_commit['body'] if parsed_commit else ""
 
     print(f"{Fore.YELLOW}Enter subject line (max 50 chars recommended):")
@@ -125,102 +171,396 @@ def create_commit_manual(parsed_commit=None):
         "body": reparsed['body'],
         "type": reparsed['type'],
         "prefix": reparsed['prefix'],
+        "scope": reparsed['scope'],
+        "breaking": reparsed['breaking'],
         "full_message": full_message
     }
 
+def resolve_model(args, repo_context, changes):
+    """Fill in args.model and args.max_tokens, routing by diff complexity unless either was given.
+
+    Returns the chosen routing tier, or None if routing was not used.
+    """
+    config = load_config()
+    tier = None
+    if args.route and args.model is None and args.max_tokens is None:
+        tiers = parse_tiers(config['routing_tiers'], config['summary_model'], config['summary_max_tokens'])
+        tier = route_model(repo_context, changes, tiers)
+    if tier:
+        args.model, args.max_tokens = tier["model"], tier["max_tokens"]
+        print(f"{Fore.CYAN}ℹ Routed to '{tier['name']}' tier: {tier['model']}, max {tier['max_tokens']} tokens "
+              f"(complexity {tier['complexity']['score']:g})")
+        if args.debug:
+            complexity = tier['complexity']
+            print(f"{Fore.CYAN}  {complexity['files']} files, {complexity['hunks']} hunks, "
+                  f"{complexity['languages']} languages, ~{complexity['tokens']} tokens")
+    if args.model is None:
+        args.model = config['summary_model']
+    if args.max_tokens is None:
+        args.max_tokens = config['summary_max_tokens']
+    return tier
+
+def generate_incremental(repo_path, repo_context, changes, args, stats, errors=None, show_spinner=True):
+    """Summarize staged files through the per-file note store, then combine the notes.
+
+    Usage of every note and combine call is added to stats. Returns the commit
+    message, or None to fall back to a full-diff request.
+    """
+    config = load_config()
+    file_entries = changes["staged_files"]
+    spinner = Spinner(f"Summarizing {len(file_entries)} files", enabled=show_spinner)
+    spinner.start()
+    # Notes use the configured summary model so routing changes do not invalidate the store
+    blob_pairs = get_blob_pairs(repo_path, '--staged', *pathspec_args(args.pathspec))
+    notes, reused = get_file_notes(file_entries, blob_pairs, config['summary_model'], DEFAULT_NOTE_WORKERS,
+                                   stats=stats, errors=errors)
+    if len(notes) < len(file_entries):
+        spinner.stop(False, f"Could not summarize {len(file_entries) - len(notes)} files")
+        return None
+    spinner.message = f"Combining notes for {len(file_entries)} files ({reused} cached)"
+    combine_stats = {}
+    message = combine_notes(notes, repo_context['branch'], args.model, args.max_tokens,
+                            stats=combine_stats, errors=errors)
+    merge_usage(stats, combine_stats)
+    spinner.stop(bool(message), f"Commit message generated ({reused}/{len(file_entries)} file notes cached)"
+                 if message else "Failed to combine file notes")
+    return message
+
+def generate_message(prompts, repo_path, repo_context, changes, args, incremental, stats,
+                     errors=None, show_spinner=True):
+    """Generate the AI message: per-file notes if incremental, else (or if they fail) the full diff.
+
+    stats receives the usage summed over every call and the total latency.
+    """
+    started = time.monotonic()
+    message = None
+    if incremental:
+        message = generate_incremental(repo_path, repo_context, changes, args, stats,
+                                       errors=errors, show_spinner=show_spinner)
+    if not message:
+        system_prompt, user_prompt = prompts
+        call_stats = {}
+        message = summarize_diff(user_prompt, system_prompt, model=args.model, max_tokens=args.max_tokens,
+                                 show_spinner=show_spinner, stats=call_stats,
+                                 response_format=COMMIT_RESPONSE_FORMAT, errors=errors,
+                                 validate=parse_structured_commit)
+        merge_usage(stats, call_stats)
+    stats["model"] = args.model
+    stats["latency"] = round(time.monotonic() - started, 3)
+    return message
+
+def generate_with_deadline(generate, deadline, stats):
+    """Race generate(stats, errors) against a deadline.
+
+    Returns (summary, pending): the AI message if it arrived in time (stats are
+    filled in), otherwise None and the still-running BackgroundSummary.
+    """
+    pending = BackgroundSummary(generate)
+    spinner = Spinner("Generating commit message with AI")
+    spinner.start()
+    if pending.wait(deadline):
+        stats.update(pending.stats)
+        if pending.result:
+            spinner.stop(True, "Commit message generated")
+        else:
+            spinner.stop(False, "AI generation failed")
+            for line in pending.errors:
+                print(line)
+        return pending.result, None
+
+    spinner.stop(False, f"No AI response within {deadline:g}s")
+    return None, pending
+
+def read_diff_input(path):
+    """Read a diff from a file, or from stdin when path is '-'."""
+    if path == '-':
+        return sys.stdin.read()
+    with open(path, encoding='utf-8', errors='replace') as diff_file:
+        return diff_file.read()
+
+def normalize_pathspec(repo_path, pathspec):
+    """Make pathspecs given relative to the working directory relative to the repository root."""
+    normalized = []
+    for spec in pathspec:
+        if spec.startswith(':'):
+            normalized.append(spec) # Magic pathspecs like ':(glob)' or ':!' are passed through
+        else:
+            normalized.append(os.path.relpath(os.path.abspath(spec), repo_path))
+    return normalized
+
+def find_staged_outside_pathspec(repo_path, pathspec):
+    """List staged paths that the pathspec does not cover."""
+    all_result = subprocess.run(git_read_command(repo_path, 'diff', '--cached', '--name-only'),
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    inside_result = subprocess.run(git_read_command(repo_path, 'diff', '--cached', '--name-only',
+                                                    *pathspec_args(pathspec)),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    inside = set(inside_result.stdout.splitlines())
+    return [path for path in all_result.stdout.splitlines() if path not in inside]
+
+def report_index_performance(repo_path):
+    """Show whether the settings that keep status and diff fast in large work trees are enabled."""
+    settings = get_index_performance_settings(repo_path)
+    if settings["fsmonitor"] and settings["untracked_cache"]:
+        print(f"{Fore.CYAN}ℹ core.fsmonitor and core.untrackedCache are enabled.")
+        return
+    for key, name in (("fsmonitor", "core.fsmonitor"), ("untracked_cache", "core.untrackedCache")):
+        if not settings[key]:
+            print(f"{Fore.YELLOW}⚠ {name} is disabled; diffs scan the whole work tree.")
+            print(f"{Fore.YELLOW}  → Enable it with 'git config {name} true'.")
+
+def collect_changes(args):
+    """Resolve the repository (or diff input) and return (repo_path, repo_context, changes)."""
+    if args.diff_file:
+        try:
+            diff_text = read_diff_input(args.diff_file)
+        except OSError as e:
+            print(f"{Fore.RED}✗ Failed to read diff: {e}")
+            sys.exit(1)
+        changes = {
+            "unstaged": "",
+            "staged": diff_text,
+            "unstaged_files": [],
+            "staged_files": split_diff_by_file(diff_text),
+            "has_unstaged": False,
+            "has_staged": bool(diff_text.strip())
+        }
+        if not changes["has_staged"]:
+            print(f"{Fore.YELLOW}⚠ The provided diff is empty.")
+            sys.exit(0)
+        return None, build_context_from_diff(changes["staged_files"]), changes
+
+    # Find git repository
+    repo_path = find_git_root()
+    if not repo_path:
+        sys.exit(1)
+
+    args.pathspec = normalize_pathspec(repo_path, args.pathspec)
+    if args.debug or args.pathspec:
+        report_index_performance(repo_path)
+
+    # Get repository context
+    repo_context = get_repository_context(repo_path, args.pathspec)
+
+    # Auto-stage changes if requested (use lightweight name-only check to avoid duplicate full diffs)
+    if args.stage:
+        names_result = subprocess.run(git_read_command(repo_path, 'diff', '--name-only',
+                                                       *pathspec_args(args.pathspec)),
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        unstaged_names = names_result.stdout.splitlines()
+        if unstaged_names:
+            if stage_specific_files(repo_path, pathspec=args.pathspec):
+                pass
+            else:
+                print(f"{Fore.RED}✗ Failed to stage changes. Aborting.")
+                sys.exit(1)
+        else:
+            print(f"{Fore.YELLOW}⚠ No unstaged changes to stage.")
+
+    # 'git commit' records the whole index, so a pathspec message must not silently cover other files
+    if args.pathspec:
+        outside = find_staged_outside_pathspec(repo_path, args.pathspec)
+        if outside:
+            shown = ", ".join(outside[:5]) + (f" and {len(outside) - 5} more" if len(outside) > 5 else "")
+            print(f"{Fore.RED}✗ Staged changes outside {' '.join(args.pathspec)} would be committed too: {shown}")
+            print(f"{Fore.YELLOW}  → Unstage them with 'git restore --staged <paths>' or run gitai without a pathspec.")
+            sys.exit(1)
+
+    # Collect full staged/unstaged diffs once
+    changes = get_git_changes(repo_path, args.pathspec)
+
+    # Verify changes exist
+    if not changes["has_staged"] and not changes["has_unstaged"]:
+        print(f"{Fore.YELLOW}⚠ No changes detected in the repository.")
+        print(f"{Fore.YELLOW}  → Make some changes or stage existing ones.")
+        sys.exit(0)
+
+    # Ensure staged changes before proceeding (unless offline)
+    if not changes["has_staged"] and not args.offline:
+        print(f"{Fore.YELLOW}⚠ No changes staged for commit.")
+        print(f"{Fore.YELLOW}  → Stage changes using 'git add <files>' or use 'gitai --stage'.")
+        sys.exit(0)
+
+    return repo_path, repo_context, changes
+
+def build_json_result(parsed_commit, source, stats, tier=None, commit_sha=None):
+    """Build the machine-readable result printed by --json."""
+    return {
+        "subject": parsed_commit["title"],
+        "body": parsed_commit["body"],
+        "type": parsed_commit["type"],
+        "prefix": parsed_commit["prefix"],
+        "scope": parsed_commit["scope"],
+        "breaking": parsed_commit["breaking"],
+        "message": parsed_commit["full_message"],
+        "source": source,
+        "model": stats.get("model"),
+        "tier": tier["name"] if tier else None,
+        "complexity": tier["complexity"]["score"] if tier else None,
+        "tokens": {
+            "prompt": stats.get("prompt_tokens", 0),
+            "completion": stats.get("completion_tokens", 0),
+            "total": stats.get("total_tokens", 0),
+            "cached": stats.get("cached_tokens", 0)
+        },
+        "latency": stats.get("latency"),
+        "rate_limit_wait": stats.get("rate_limit_wait", 0.0),
+        "cache_hit": source == "draft" or stats.get("cached_tokens", 0) > 0,
+        "committed": commit_sha is not None,
+        "commit": commit_sha
+    }
+
 def main():
+    real_stdout = sys.stdout
     try:
+        # Range subcommands have their own parsers
+        if len(sys.argv) > 1 and sys.argv[1] in ("pr", "changelog"):
+            range_main(sys.argv[1], sys.argv[2:])
+            return
+        if len(sys.argv) > 1 and sys.argv[1] == "watch":
+            watch_main(sys.argv[2:])
+            return
+
         parser = create_parser()
         args = parser.parse_args()
+        non_interactive = args.yes or args.json
+        if args.json:
+            # Keep stdout for the JSON document; progress and errors go to stderr
+            sys.stdout = sys.stderr
+        if non_interactive:
+            Spinner.interactive = False
         # If pushing is enabled and staging disabled but not explicitly disabled, enable staging
         if args.push and not args.stage and '--no-stage' not in sys.argv:
             args.stage = True
             print(f"{Fore.CYAN}ℹ Enabling staging because push is enabled.")
 
-        # Find git repository
-        repo_path = find_git_root()
-        if not repo_path:
-            sys.exit(1)
-
-        # Get repository context
-        repo_context = get_repository_context(repo_path)
-
-        # Auto-stage changes if requested (use lightweight name-only check to avoid duplicate full diffs)
-        if args.stage:
-            names_result = subprocess.run(['git', '-C', repo_path, 'diff', '--name-only'],
-                                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            unstaged_names = names_result.stdout.splitlines()
-            if unstaged_names:
-                if stage_specific_files(repo_path):
-                    pass
-                else:
-                    print(f"{Fore.RED}✗ Failed to stage changes. Aborting.")
-                    sys.exit(1)
-            else:
-                print(f"{Fore.YELLOW}⚠ No unstaged changes to stage.")
-
-        # Collect full staged/unstaged diffs once
-        changes = get_git_changes(repo_path)
-
-        # Verify changes exist
-        if not changes["has_staged"] and not changes["has_unstaged"]:
-            print(f"{Fore.YELLOW}⚠ No changes detected in the repository.")
-            print(f"{Fore.YELLOW}  → Make some changes or stage existing ones.")
-            sys.exit(0)
-
-        # Ensure staged changes before proceeding (unless offline)
-        if not changes["has_staged"] and not args.offline:
-            print(f"{Fore.YELLOW}⚠ No changes staged for commit.")
-            print(f"{Fore.YELLOW}  → Stage changes using 'git add <files>' or use 'gitai --stage'.")
-            sys.exit(0)
+        repo_path, repo_context, changes = collect_changes(args)
 
         # Handle modes
         parsed_commit = None
+        pending_summary = None
+        stats = {}
+        source = "ai"
+        tier = None
         if args.offline:
             if not changes["has_staged"]:
                  print(f"{Fore.YELLOW}⚠ No staged changes. In offline mode, you must stage changes manually first.")
                  sys.exit(1)
-            parsed_commit = create_commit_manual()
+            draft = generate_heuristic_message(repo_context, changes)
+            if non_interactive:
+                parsed_commit = parse_commit_message(draft)
+                parsed_commit["full_message"] = draft
+                source = "heuristic"
+            else:
+                parsed_commit = create_commit_manual(parse_commit_message(draft))
+                source = "manual"
             if not parsed_commit:
                 print(f"{Fore.RED}✗ Commit creation cancelled or failed.")
                 sys.exit(1)
         else:
             # Online mode
-            if not check_api_key():
+            watch_draft = find_matching_draft(repo_path, changes["staged_files"]) if repo_path else None
+            if watch_draft:
+                print(f"{Fore.GREEN}✓ Using the draft kept up to date by 'gitai watch'")
+            elif not check_api_key():
                 sys.exit(1)
 
+            if args.enrich and repo_path and changes["has_staged"] and not watch_draft:
+                changes["scopes"] = collect_enclosing_scopes(repo_path, changes["staged_files"])
+                if args.debug:
+                    print(f"{Fore.CYAN}ℹ Found {len(changes['scopes'])} enclosing functions/classes for staged hunks")
+
             system_prompt, user_prompt = create_diff_prompt(repo_context, changes)
             if not system_prompt:
                 print(f"{Fore.YELLOW}⚠ No changes found to generate commit message for.")
                 sys.exit(0)
 
-            ai_summary = summarize_diff(user_prompt, system_prompt,
-                                       model=args.model,
-                                       max_tokens=args.max_tokens)
-            if not ai_summary:
-                print(f"{Fore.RED}✗ Failed to generate commit message summary.")
-                sys.exit(1)
-
-            parsed_commit = parse_commit_message(ai_summary)
-            parsed_commit["full_message"] = ai_summary # Store original full message
+            tier = None if watch_draft else resolve_model(args, repo_context, changes)
+
+            file_count = len(changes["staged_files"]) if repo_path else 0
+            incremental = args.incremental and file_count >= load_config()['incremental_min_files'] and \
+                not changes.get("submodules")
+            ai_summary = None
+            if watch_draft:
+                ai_summary = watch_draft
+                source = "draft"
+            elif args.deadline > 0 and not non_interactive:
+                # Racing only makes sense when someone reviews the draft; covers the per-file path too
+                ai_summary, pending_summary = generate_with_deadline(
+                    lambda run_stats, errors: generate_message((system_prompt, user_prompt), repo_path,
+                                                               repo_context, changes, args, incremental,
+                                                               run_stats, errors=errors, show_spinner=False),
+                    args.deadline, stats)
+            else:
+                ai_summary = generate_message((system_prompt, user_prompt), repo_path, repo_context,
+                                              changes, args, incremental, stats)
+
+            if ai_summary:
+                parsed_commit = parse_structured_commit(ai_summary)
+                if stats:
+                    # Cached tokens come from the provider's automatic prompt-prefix cache
+                    answered_by = f"'{tier['name']}' tier" if tier else stats['model']
+                    print(f"{Fore.CYAN}ℹ {answered_by} answered in {stats['latency']:.2f}s "
+                          f"({stats['cached_tokens']}/{stats['prompt_tokens']} prompt tokens cached)")
+            else:
+                # Fall back to the local draft so a slow or unreachable API never blocks the commit
+                if non_interactive and not args.allow_fallback:
+                    # Nobody reviews the draft here, so never commit it unless asked to
+                    print(f"{Fore.RED}✗ Failed to generate commit message summary.")
+                    print(f"{Fore.YELLOW}  → Pass '--allow-fallback' to use the local draft in unattended runs.")
+                    sys.exit(1)
+                if pending_summary:
+                    print(f"{Fore.CYAN}ℹ Showing a local draft; the AI message replaces it if it arrives while you review.")
+                else:
+                    print(f"{Fore.YELLOW}⚠ Failed to generate commit message summary. Using a local draft instead.")
+                draft = generate_heuristic_message(repo_context, changes)
+                parsed_commit = parse_commit_message(draft)
+                parsed_commit["full_message"] = draft
+                source = "heuristic"
+
+        # Confirmation loop (skipped for automation and for diffs read from a file)
+        while not non_interactive and repo_path:
+            # Swap in the AI message if it arrived while the local draft was under review
+            if pending_summary and pending_summary.done():
+                if pending_summary.result:
+                    print(f"\n{Fore.CYAN}ℹ AI-generated message arrived, replacing the local draft.")
+                    parsed_commit = parse_structured_commit(pending_summary.result)
+                    stats = pending_summary.stats
+                    source = "ai"
+                else:
+                    print(f"\n{Fore.YELLOW}⚠ AI generation failed; keeping the local draft.")
+                    for line in pending_summary.errors:
+                        print(line)
+                pending_summary = None
 
-        # Confirmation loop
-        while True:
             print("\n" + format_commit_display(parsed_commit))
 
             subject_len = len(parsed_commit['title'])
             subject_status = f"{Fore.GREEN}✓" if subject_len <= 50 else f"{Fore.RED}✗"
             print(f"{subject_status} Subject line: {subject_len}/50 characters")
+            if args.debug and stats:
+                print(f"{Fore.CYAN}ℹ {stats['model']}: {stats['prompt_tokens']} prompt "
+                      f"({stats['cached_tokens']} cached) + {stats['completion_tokens']} completion tokens "
+                      f"in {stats['latency']:.2f}s")
 
-            print(f"\n{Fore.CYAN}Commit this message? [Y/e/n] (Yes / Edit / No): ", end="")
+            if pending_summary:
+                print(f"\n{Fore.CYAN}Commit this message? [Y/e/n/r] (Yes / Edit / No / Refresh): ", end="")
+            else:
+                print(f"\n{Fore.CYAN}Commit this message? [Y/e/n] (Yes / Edit / No): ", end="")
             confirm = input().strip().lower()
 
             if confirm == 'y' or confirm == '':
+                if pending_summary and pending_summary.done() and pending_summary.result:
+                    continue # Show the AI message that arrived during review before committing
                 break
+            elif confirm == 'r' and pending_summary:
+                continue
             elif confirm == 'e':
                 edited_commit = create_commit_manual(parsed_commit)
                 if edited_commit:
                     parsed_commit = edited_commit
+                    pending_summary = None # Never overwrite a message the user edited
+                    source = "manual"
                 else:
                     print(f"{Fore.YELLOW}⚠ Edit cancelled. Keeping previous message.")
             elif confirm == 'n':
@@ -229,11 +569,23 @@ def main():
             else:
                 print(f"{Fore.RED}✗ Invalid choice. Please enter Y, e, or n.")
 
+        # Without a repository (diff input) or in --json without --yes, only report the message
+        if not repo_path or (args.json and not args.yes):
+            if args.json:
+                print(json.dumps(build_json_result(parsed_commit, source, stats, tier)), file=real_stdout)
+            else:
+                print("\n" + format_commit_display(parsed_commit))
+            return
+
+        commit_sha = None
         try:
             commit_cmd = ['git', '-C', repo_path, 'commit', '-m', parsed_commit["full_message"]]
             result = subprocess.run(commit_cmd, capture_output=True, text=True, check=True)
             print(f"{Fore.GREEN}✓ Commit successful!")
             print(result.stdout.strip())
+            sha_result = subprocess.run(git_read_command(repo_path, 'rev-parse', 'HEAD'),
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            commit_sha = sha_result.stdout.strip() or None
 
             # Push if requested
             if args.push:
@@ -264,10 +616,12 @@ def main():
         except Exception as e:
             print(f"{Fore.RED}✗ An unexpected error occurred during commit/push: {e}")
             sys.exit(1)
+
+        if args.json:
+            print(json.dumps(build_json_result(parsed_commit, source, stats, tier, commit_sha)), file=real_stdout)
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}⚠ Operation cancelled by user.")
         sys.exit(0)
 
 if __name__ == "__main__":
     main()
-
@@ -2,7 +2,10 @@
 
 import configparser
 from .setup import CONFIG_FILE, DEFAULT_SUMMARY_MODEL, DEFAULT_SUMMARY_MAX_TOKENS, \
-    DEFAULT_DESCRIPTION_MODEL, DEFAULT_DESCRIPTION_MAX_TOKENS, DEFAULT_COMMAND_BEHAVIOR
+    DEFAULT_DESCRIPTION_MODEL, DEFAULT_DESCRIPTION_MAX_TOKENS, DEFAULT_COMMAND_BEHAVIOR, DEFAULT_AI_DEADLINE, \
+    DEFAULT_RATE_LIMIT_RPM, DEFAULT_RATE_LIMIT_TPM, DEFAULT_ROUTING_ENABLED, DEFAULT_ROUTING_TIERS, \
+    DEFAULT_SUBMODULE_MAX_TOKENS, DEFAULT_SUBMODULE_WORKERS, DEFAULT_INCREMENTAL_ENABLED, DEFAULT_INCREMENTAL_MIN_FILES, \
+    DEFAULT_ENRICHMENT_ENABLED
 
 
 def load_config():
@@ -23,6 +26,26 @@ def load_config():
     data['description_model'] = parser.get('AI', 'description_model', fallback=DEFAULT_DESCRIPTION_MODEL)
     data['description_max_tokens'] = parser.getint('AI', 'description_max_tokens', fallback=DEFAULT_DESCRIPTION_MAX_TOKENS)
     data['default_command_behavior'] = parser.get('AI', 'default_command_behavior', fallback=DEFAULT_COMMAND_BEHAVIOR)
+    data['ai_deadline'] = parser.getfloat('AI', 'ai_deadline', fallback=DEFAULT_AI_DEADLINE)
+
+    # RateLimit section
+    data['rate_limit_rpm'] = parser.getint('RateLimit', 'requests_per_minute', fallback=DEFAULT_RATE_LIMIT_RPM)
+    data['rate_limit_tpm'] = parser.getint('RateLimit', 'tokens_per_minute', fallback=DEFAULT_RATE_LIMIT_TPM)
+
+    # Submodules section
+    data['submodule_max_tokens'] = parser.getint('Submodules', 'max_tokens', fallback=DEFAULT_SUBMODULE_MAX_TOKENS)
+    data['submodule_workers'] = parser.getint('Submodules', 'workers', fallback=DEFAULT_SUBMODULE_WORKERS)
+
+    # Incremental section
+    data['incremental_enabled'] = parser.getboolean('Incremental', 'enabled', fallback=DEFAULT_INCREMENTAL_ENABLED)
+    data['incremental_min_files'] = parser.getint('Incremental', 'min_files', fallback=DEFAULT_INCREMENTAL_MIN_FILES)
+
+    # Enrichment section
+    data['enrichment_enabled'] = parser.getboolean('Enrichment', 'enabled', fallback=DEFAULT_ENRICHMENT_ENABLED)
+
+    # Routing section
+    data['routing_enabled'] = parser.getboolean('Routing', 'enabled', fallback=DEFAULT_ROUTING_ENABLED)
+    data['routing_tiers'] = parser.get('Routing', 'tiers', fallback=DEFAULT_ROUTING_TIERS)
 
     return data
 
@@ -0,0 +1,160 @@
+import os
+import re
+import subprocess
+
+# Keep the added context small next to the diff itself
+MAX_SCOPES_PER_FILE = 5
+MAX_SCOPES = 60
+MAX_SIGNATURE_CHARS = 120
+
+# Lightweight equivalents of git's userdiff funcname patterns, keyed by file extension
+_PYTHON = r"^\s*(?:async\s+)?(?:def|class)\s+\w+"
+_JAVASCRIPT = (r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function\b|class\s+\w+)"
+               r"|^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)"
+               r"|^\s*(?:(?:public|private|protected|static|async|get|set)\s+)*"
+               r"(?!(?:if|for|while|switch|catch|return)\b)\w+\s*\([^)]*\)\s*\{")
+_GO = r"^\s*func\b|^\s*type\s+\w+\s+(?:struct|interface)\b"
+_RUST = r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?(?:fn|impl|struct|enum|trait|mod)\b"
+_JAVA_LIKE = (r"^\s*(?:(?:public|private|protected|internal|static|final|abstract|sealed|open|data|override)\s+)*"
+              r"(?:class|interface|enum|record|object|fun)\s+\w+"
+              r"|^\s*(?:(?:public|private|protected|internal|static|final|abstract|synchronized|override|async|virtual)\s+)+"
+              r"[\w<>\[\],.?\s]+\s+\w+\s*\(")
+_C_LIKE = r"^\s*(?:class|struct|namespace)\s+\w+|^[A-Za-z_][\w\s*&:<>,~]*\([^;]*$"
+_RUBY = r"^\s*(?:def|class|module)\s+"
+_PHP = r"^\s*(?:(?:public|private|protected|static|abstract|final)\s+)*(?:function|class|interface|trait)\s+\w+"
+_SHELL = r"^\s*(?:function\s+)?\w+\s*\(\)|^\s*function\s+\w+"
+
+FUNCNAME_PATTERNS = {
+    ".py": _PYTHON,
+    ".js": _JAVASCRIPT, ".jsx": _JAVASCRIPT, ".mjs": _JAVASCRIPT, ".cjs": _JAVASCRIPT,
+    ".ts": _JAVASCRIPT, ".tsx": _JAVASCRIPT,
+    ".go": _GO,
+    ".rs": _RUST,
+    ".java": _JAVA_LIKE, ".kt": _JAVA_LIKE, ".cs": _JAVA_LIKE, ".scala": _JAVA_LIKE,
+    ".c": _C_LIKE, ".h": _C_LIKE, ".cc": _C_LIKE, ".cpp": _C_LIKE, ".hpp": _C_LIKE,
+    ".rb": _RUBY,
+    ".php": _PHP,
+    ".sh": _SHELL, ".bash": _SHELL,
+}
+_COMPILED = {}
+
+NON_STRUCTURAL_PREFIXES = ('#', '//', '/*', '*')
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+def funcname_pattern(path):
+    """Return the compiled header pattern for a file, or None for unsupported languages."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FUNCNAME_PATTERNS:
+        return None
+    if ext not in _COMPILED:
+        _COMPILED[ext] = re.compile(FUNCNAME_PATTERNS[ext])
+    return _COMPILED[ext]
+
+class CatFileBatch:
+    """One long-lived 'git cat-file --batch' process for reading many blobs without a spawn per file."""
+    def __init__(self, repo_path):
+        self._process = subprocess.Popen(['git', '-C', repo_path, 'cat-file', '--batch'],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+
+    def read(self, spec):
+        """Return the contents of an object spec such as ':path' or 'HEAD:path', or None if missing."""
+        self._process.stdin.write(spec.encode('utf-8') + b"\n")
+        self._process.stdin.flush()
+        header = self._process.stdout.readline()
+        if not header or header.endswith(b" missing\n") or header.endswith(b" ambiguous\n"):
+            return None
+        size = int(header.split()[2])
+        data = self._process.stdout.read(size)
+        self._process.stdout.read(1) # Trailing newline after the object
+        return data.decode('utf-8', errors='replace')
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def changed_block_starts(file_diff, use_old_side=False):
+    """Return the 1-based line number where each run of changed lines starts.
+
+    Hunks merge nearby edits, so one hunk can span several functions.
+    """
+    line_numbers = []
+    old_line = new_line = 0
+    in_hunk = in_change = False
+    for line in file_diff.splitlines():
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_line, new_line = int(match.group(1)), int(match.group(2))
+            in_hunk, in_change = True, False
+        elif not in_hunk or not line or line[0] not in ' +-':
+            continue
+        elif line[0] == ' ':
+            old_line += 1
+            new_line += 1
+            in_change = False
+        else:
+            if not in_change:
+                line_numbers.append(old_line if use_old_side else new_line)
+                in_change = True
+            if line[0] == '-':
+                old_line += 1
+            else:
+                new_line += 1
+    return line_numbers
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+def enclosing_signatures(lines, line_number, pattern):
+    """Return the headers enclosing a line, outermost first, e.g. ['class Cache', 'def get(self, key)']."""
+    index = min(line_number, len(lines)) - 1
+    target = lines[index] if 0 <= index < len(lines) else ""
+    indent = _indent(target) if target.strip() else float('inf')
+    signatures = []
+    for line in reversed(lines[:max(index, 0)]):
+        stripped = line.strip()
+        # Comments, preprocessor lines and a lone '{' say nothing about nesting
+        if not stripped or _indent(line) >= indent or stripped == '{' or stripped.startswith(NON_STRUCTURAL_PREFIXES):
+            continue
+        # Any less indented line closes the blocks below it, header or not ('if ...:', '}')
+        indent = _indent(line)
+        if pattern.match(line):
+            signatures.append(stripped.rstrip(' {:')[:MAX_SIGNATURE_CHARS])
+        if indent == 0:
+            break
+    return list(reversed(signatures))
+
+def collect_enclosing_scopes(repo_path, file_entries):
+    """Name the enclosing function or class of every changed block, e.g. 'app.py: class Cache > def get(self)'."""
+    scopes = []
+    files = [entry for entry in file_entries if funcname_pattern(entry["path"])]
+    if not files:
+        return scopes
+
+    try:
+        with CatFileBatch(repo_path) as batch:
+            for entry in files:
+                deleted = entry["status"] == "deleted"
+                content = batch.read(f"HEAD:{entry['old_path']}" if deleted else f":{entry['path']}")
+                if content is None:
+                    continue
+                lines = content.splitlines()
+                pattern = funcname_pattern(entry["path"])
+                file_scopes = []
+                for line_number in changed_block_starts(entry["diff"], use_old_side=deleted):
+                    chain = " > ".join(enclosing_signatures(lines, line_number, pattern))
+                    if chain and chain not in file_scopes:
+                        file_scopes.append(chain)
+                scopes.extend(f"{entry['path']}: {chain}" for chain in file_scopes[:MAX_SCOPES_PER_FILE])
+                if len(scopes) >= MAX_SCOPES:
+                    break
+    except (OSError, ValueError, IndexError):
+        pass # Enrichment is best effort; the diff alone still works
+    return scopes[:MAX_SCOPES]
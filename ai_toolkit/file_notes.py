@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .ai_service import summarize_diff, merge_usage
+from .cache import cache_get, cache_put
+from .utils import truncate_to_tokens, parse_structured_commit, COMMIT_RESPONSE_FORMAT
+
+# Budget for one file's diff and for the note the model writes about it
+FILE_DIFF_MAX_TOKENS = 3000
+FILE_NOTE_MAX_TOKENS = 80
+DEFAULT_NOTE_WORKERS = 8
+
+FILE_NOTE_PROMPT = """You describe the change to ONE file from a git diff for a later commit message.
+Reply with one line of at most 20 words: what changed and, if evident, why.
+No preamble, no file name, no code fences.
+"""
+
+COMBINE_NOTES_PROMPT = """You are an expert at writing concise, human-like git commit messages.
+You receive one short note per changed file. Combine them into a single commit message,
+as a JSON object with these fields:
+- type: one of feat, fix, docs, style, refactor, perf, test, chore
+- scope: the affected component in one word, or "" if there is no clear one
+- subject: imperative, under 50 characters, no trailing period, without the type prefix
+- body: WHY the change was made, wrapped at 72 characters, or "" if the subject is clear
+- breaking: true only if the change breaks existing users
+"""
+
+def summarize_file(file_entry, model, stats=None, errors=None):
+    """Write a one-line note for a single file's diff; None on API failure."""
+    user_prompt = f"FILE: {file_entry['path']} ({file_entry['status']})\n\nDIFF:\n" \
+                  f"{truncate_to_tokens(file_entry['diff'], FILE_DIFF_MAX_TOKENS)}"
+    note = summarize_diff(user_prompt, FILE_NOTE_PROMPT, model=model,
+                          max_tokens=FILE_NOTE_MAX_TOKENS, show_spinner=False, stats=stats, errors=errors)
+    return note.strip() if note else None
+
+def summarize_files(file_entries, model, workers, stats=None, errors=None):
+    """Write notes for several files concurrently; returns {path: note} for the ones that succeeded.
+
+    If a stats dict is given, the usage of every call is added to it.
+    """
+    if not file_entries:
+        return {}
+    call_stats = [{} for _ in file_entries]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        notes = list(pool.map(lambda args: summarize_file(args[0], model, stats=args[1], errors=errors),
+                              zip(file_entries, call_stats)))
+    if stats is not None:
+        for usage in call_stats:
+            merge_usage(stats, usage)
+    return {entry["path"]: note for entry, note in zip(file_entries, notes) if note}
+
+def note_key(blob_pair, model):
+    """Key a file note on the exact before/after content and the model that wrote it."""
+    return f"{blob_pair[0]}:{blob_pair[1]}:{model}"
+
+def get_file_notes(file_entries, blob_pairs, model, workers, stats=None, errors=None):
+    """Return ({path: note}, reused count), sending only blob pairs missing from the store to the model."""
+    notes = {}
+    missing = []
+    for entry in file_entries:
+        blob_pair = blob_pairs.get(entry["path"])
+        cached = cache_get("file_notes", note_key(blob_pair, model)) if blob_pair else None
+        if cached:
+            notes[entry["path"]] = cached["note"]
+        else:
+            missing.append(entry)
+
+    fresh = summarize_files(missing, model, workers, stats=stats, errors=errors)
+    for path, note in fresh.items():
+        if path in blob_pairs:
+            cache_put("file_notes", note_key(blob_pairs[path], model), {"note": note})
+    notes.update(fresh)
+    return notes, len(file_entries) - len(missing)
+
+def combine_notes(notes, branch, model, max_tokens, stats=None, errors=None):
+    """Merge per-file notes into one commit message (schema-validated JSON) with a single short API call."""
+    lines = "\n".join(f"- {path}: {note}" for path, note in sorted(notes.items()))
+    user_prompt = f"BRANCH: {branch}\n\nFILE NOTES:\n{lines}"
+    return summarize_diff(user_prompt, COMBINE_NOTES_PROMPT, model=model,
+                          max_tokens=max_tokens, show_spinner=False, stats=stats, errors=errors,
+                          response_format=COMMIT_RESPONSE_FORMAT, validate=parse_structured_commit)
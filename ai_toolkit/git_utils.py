@@ -1,53 +1,84 @@
 import os
+import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, init
 # Assuming ui_utils is in the same directory
 from .ui_utils import Spinner
+from .utils import count_file_types, split_diff_by_file, truncate_to_tokens
+from .config_manager import load_config
 
 # Initialize colorama
 init(autoreset=True)
 
+# "+Subproject commit <sha>[-dirty]" lines emitted for gitlinks in superproject diffs
+SUBPROJECT_LINE = re.compile(r"^Subproject commit ([0-9a-f]{7,64})(-dirty)?$")
+
+def git_read_command(repo_path, *args):
+    """Build a read-only git command that never takes the index lock or refreshes the index."""
+    return ['git', '--no-optional-locks', '-C', repo_path, *args]
+
+def pathspec_args(pathspec):
+    """Return the '-- <pathspec>' suffix limiting a git command to a subtree, if any."""
+    return ['--', *pathspec] if pathspec else []
+
 def find_git_root():
     """Find the root directory of the Git repository."""
     current_dir = os.getcwd()
-    while current_dir != '/':
-        if '.git' in os.listdir(current_dir):
+    while True:
+        # One stat per ancestor; listing each directory is slow on network filesystems
+        if os.path.exists(os.path.join(current_dir, '.git')):
             return current_dir
-        current_dir = os.path.dirname(current_dir)
+        parent_dir = os.path.dirname(current_dir)
+        if parent_dir == current_dir:
+            break
+        current_dir = parent_dir
     print(f"{Fore.RED}✗ No Git repository found in current directory or its parents.")
     return None
 
-def get_repository_context(repo_path):
+def get_index_performance_settings(repo_path):
+    """Report whether core.fsmonitor and the untracked cache are enabled for this repository."""
+    result = subprocess.run(git_read_command(repo_path, 'config', '--get-regexp',
+                                             r'^(core\.(fsmonitor|untrackedcache)|feature\.manyfiles)$'),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    values = dict(line.split(' ', 1) for line in result.stdout.splitlines() if ' ' in line)
+    fsmonitor = values.get('core.fsmonitor', 'false')
+    untracked_cache = values.get('core.untrackedcache')
+    if untracked_cache is None:
+        # feature.manyFiles turns the untracked cache on unless set explicitly
+        untracked_cache = values.get('feature.manyfiles', 'false')
+    return {
+        "fsmonitor": fsmonitor.lower() not in ('false', 'no', 'off', '0', ''),
+        "untracked_cache": untracked_cache.lower() in ('true', 'yes', 'on', '1')
+    }
+
+def get_repository_context(repo_path, pathspec=None):
     """Get contextual information about the repository and its changes."""
     spinner = Spinner("Analyzing repository context")
     spinner.start()
 
     try:
         # Get current branch name
-        branch_result = subprocess.run(['git', '-C', repo_path, 'branch', '--show-current'],
+        branch_result = subprocess.run(git_read_command(repo_path, 'branch', '--show-current'),
                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         current_branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "unknown"
         spinner.update() # Keep update for potential future progress steps within this function
 
         # Get file statistics for better context
-        stats_result = subprocess.run(['git', '-C', repo_path, 'diff', '--stat'],
+        stats_result = subprocess.run(git_read_command(repo_path, 'diff', '--stat', *pathspec_args(pathspec)),
                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         stats = stats_result.stdout if stats_result.returncode == 0 else ""
         spinner.update()
 
         # Get modified file types for context
-        files_result = subprocess.run(['git', '-C', repo_path, 'diff', '--name-only'],
+        files_result = subprocess.run(git_read_command(repo_path, 'diff', '--name-only', *pathspec_args(pathspec)),
                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         changed_files = files_result.stdout.splitlines() if files_result.returncode == 0 else []
         spinner.update()
 
         # Extract file extensions to understand languages/components being modified
-        file_types = {}
-        for file in changed_files:
-            ext = os.path.splitext(file)[1]
-            if ext:
-                file_types[ext] = file_types.get(ext, 0) + 1
+        file_types = count_file_types(changed_files)
 
         result = {
             "branch": current_branch,
@@ -67,44 +98,176 @@ def get_repository_context(repo_path):
             "changed_files": []
         }
 
-def get_git_changes(repo_path):
+def get_git_changes(repo_path, pathspec=None):
     """Get comprehensive diff information including both staged and unstaged changes."""
     spinner = Spinner("Collecting Git changes")
     spinner.start()
 
     try:
         # Get unstaged changes
-        unstaged_result = subprocess.run(['git', '-C', repo_path, 'diff'],
+        unstaged_result = subprocess.run(git_read_command(repo_path, 'diff', *pathspec_args(pathspec)),
                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         unstaged = unstaged_result.stdout if unstaged_result.returncode == 0 else ""
         spinner.update()
 
         # Get staged changes
-        staged_result = subprocess.run(['git', '-C', repo_path, 'diff', '--staged'],
+        staged_result = subprocess.run(git_read_command(repo_path, 'diff', '--staged', *pathspec_args(pathspec)),
                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         staged = staged_result.stdout if staged_result.returncode == 0 else ""
 
+        # Parsed once here; later stages (routing, enrichment, notes, heuristics) reuse the entries
+        staged_files = split_diff_by_file(staged)
+        unstaged_files = split_diff_by_file(unstaged)
+
+        # Descend into changed submodules instead of sending opaque "Subproject commit" lines
+        config = load_config()
+        submodules = collect_submodule_changes(repo_path, staged_files + unstaged_files,
+                                               config['submodule_max_tokens'], config['submodule_workers'])
+
         result = {
             "unstaged": unstaged,
             "staged": staged,
+            "unstaged_files": unstaged_files,
+            "staged_files": staged_files,
             "has_unstaged": bool(unstaged.strip()),
-            "has_staged": bool(staged.strip())
+            "has_staged": bool(staged.strip()),
+            "submodules": submodules
         }
 
-        spinner.stop(True, "Git changes collected")
+        if submodules:
+            spinner.stop(True, f"Git changes collected ({len(submodules)} submodules)")
+        else:
+            spinner.stop(True, "Git changes collected")
         return result
     except Exception as e:
         spinner.stop(False, f"Failed to collect Git changes: {e}")
         return {
             "unstaged": "",
             "staged": "",
+            "unstaged_files": [],
+            "staged_files": [],
             "has_unstaged": False,
-            "has_staged": False
+            "has_staged": False,
+            "submodules": []
         }
 
-def stage_specific_files(repo_path, files=None):
-    """Stages specific files or all changes if no files are specified."""
-    if not files:
+def find_changed_submodules(file_entries):
+    """Map each submodule path in parsed diff entries to its old and new commit and dirty state."""
+    submodules = {}
+    for entry in file_entries:
+        old = [m.group(1) for m in map(SUBPROJECT_LINE.match, entry["removed_lines"]) if m]
+        new = [m for m in map(SUBPROJECT_LINE.match, entry["added_lines"]) if m]
+        if not old and not new:
+            continue
+        info = submodules.setdefault(entry["path"], {"old": None, "new": None, "dirty": False})
+        if old and info["old"] is None:
+            info["old"] = old[0]
+        if new:
+            info["new"] = new[-1].group(1)
+            info["dirty"] = info["dirty"] or bool(new[-1].group(2))
+    # Staged and unstaged diffs are combined: a dirty-only change shows the same commit on both sides
+    for info in submodules.values():
+        info["old"] = info["old"] or info["new"]
+        info["new"] = info["new"] or info["old"]
+    return submodules
+
+def _collect_submodule(repo_path, path, info, max_tokens):
+    """Gather the commit log and diff inside one submodule."""
+    sub_path = os.path.join(repo_path, path)
+    log, diff_parts = "", []
+    if info["old"] != info["new"]:
+        log_result = subprocess.run(git_read_command(sub_path, 'log', '--oneline', f"{info['old']}..{info['new']}"),
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        log = log_result.stdout.strip() if log_result.returncode == 0 else ""
+        range_result = subprocess.run(git_read_command(sub_path, 'diff', info['old'], info['new']),
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if range_result.returncode == 0:
+            diff_parts.append(range_result.stdout)
+    if info["dirty"]:
+        dirty_result = subprocess.run(git_read_command(sub_path, 'diff', 'HEAD'),
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if dirty_result.returncode == 0:
+            diff_parts.append(dirty_result.stdout)
+
+    diff = "".join(diff_parts)
+    return {
+        "path": path,
+        "old": info["old"],
+        "new": info["new"],
+        "dirty": info["dirty"],
+        "log": truncate_to_tokens(log, max_tokens // 4) if log else "",
+        "diff": truncate_to_tokens(diff, max_tokens),
+        "raw_diff": diff
+    }
+
+def collect_submodule_changes(repo_path, file_entries, max_tokens, workers):
+    """Collect changes inside changed submodules, level by level, on a worker pool.
+
+    Each submodule gets its own token budget; nested submodules are found in
+    their parent's diff and collected in the next round.
+    """
+    pending = [(repo_path, "", find_changed_submodules(file_entries))]
+    collected = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending:
+            jobs = []
+            for parent_path, prefix, submodules in pending:
+                for path, info in submodules.items():
+                    jobs.append((prefix, pool.submit(_collect_submodule, parent_path, path, info, max_tokens)))
+            pending = []
+            for prefix, job in jobs:
+                submodule = job.result()
+                sub_path = os.path.join(prefix, submodule["path"]) if prefix else submodule["path"]
+                nested = find_changed_submodules(split_diff_by_file(submodule.pop("raw_diff")))
+                if nested:
+                    pending.append((os.path.join(repo_path, sub_path), sub_path, nested))
+                submodule["path"] = sub_path
+                collected.append(submodule)
+    return collected
+
+def get_blob_pairs(repo_path, *diff_args):
+    """Map each changed path to its (old blob SHA, new blob SHA) from 'git diff --raw'.
+
+    Work-tree files, reported with an all-zero SHA, are hashed with 'git hash-object'.
+    """
+    result = subprocess.run(git_read_command(repo_path, 'diff', '--raw', '--no-abbrev', '-z', *diff_args),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace')
+    if result.returncode != 0:
+        return {}
+
+    pairs = {}
+    unhashed = []
+    tokens = result.stdout.split('\0')
+    index = 0
+    while index < len(tokens):
+        meta = tokens[index]
+        if not meta.startswith(':'):
+            index += 1
+            continue
+        _, _, old_sha, new_sha, status = meta[1:].split()
+        # Renames and copies list the source and destination paths
+        path_count = 2 if status[0] in "RC" else 1
+        path = tokens[index + path_count]
+        index += path_count + 1
+        if not new_sha.strip('0') and status != 'D':
+            unhashed.append(path)
+        pairs[path] = (old_sha, new_sha)
+
+    if unhashed:
+        hash_result = subprocess.run(git_read_command(repo_path, 'hash-object', '--stdin-paths'),
+                                     input="\n".join(unhashed), stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, text=True)
+        hashes = hash_result.stdout.split() if hash_result.returncode == 0 else []
+        for path, sha in zip(unhashed, hashes):
+            pairs[path] = (pairs[path][0], sha)
+    return pairs
+
+def stage_specific_files(repo_path, files=None, pathspec=None):
+    """Stages specific files, all changes under a pathspec, or all changes if neither is given."""
+    if pathspec and not files:
+        command = ['git', '-C', repo_path, 'add', '-A'] + pathspec_args(pathspec)
+        message = f"Staging changes in {' '.join(pathspec)}"
+    elif not files:
         command = ['git', '-C', repo_path, 'add', '.']
         message = "Staging all changes"
     else:
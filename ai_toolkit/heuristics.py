@@ -0,0 +1,144 @@
+import os
+import re
+
+
+# Path classifiers used to infer the commit type without calling the API
+TEST_PATH = re.compile(r"(^|/)(tests?|__tests__|spec)/|(^|/)test_[^/]*$|_test\.\w+$|\.(spec|test)\.\w+$")
+DOCS_PATH = re.compile(r"(^|/)docs?/|\.(md|rst|adoc)$|(^|/)(README|CHANGELOG|LICENSE|CONTRIBUTING)[^/]*$", re.IGNORECASE)
+CI_PATH = re.compile(r"(^|/)\.github/workflows/|(^|/)\.circleci/|(^|/)\.gitlab-ci\.yml$|(^|/)\.travis\.yml$|"
+                     r"(^|/)Jenkinsfile$|(^|/)azure-pipelines\.yml$")
+DEPS_PATH = re.compile(r"(^|/)(requirements[^/]*\.txt|Pipfile(\.lock)?|poetry\.lock|pyproject\.toml|package(-lock)?\.json|"
+                       r"yarn\.lock|pnpm-lock\.yaml|go\.(mod|sum)|Cargo\.(toml|lock)|Gemfile(\.lock)?)$")
+
+# Symbol definitions for the common languages; group 1 is the symbol name
+SYMBOL_PATTERNS = [
+    re.compile(r"^\s*(?:async\s+)?def\s+(\w+)"),                      # Python, Ruby
+    re.compile(r"^\s*class\s+(\w+)"),                                 # Python, JS/TS, Java, Ruby
+    re.compile(r"^\s*(?:export\s+)?(?:async\s+)?function\s+(\w+)"),   # JS/TS
+    re.compile(r"^\s*(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s*)?\("),  # JS/TS arrow functions
+    re.compile(r"^\s*func\s+(?:\([^)]*\)\s*)?(\w+)"),                 # Go
+    re.compile(r"^\s*(?:pub\s+)?fn\s+(\w+)"),                         # Rust
+]
+
+SUBJECT_LIMIT = 50
+
+def classify_path(path):
+    """Return the category ('test', 'docs', 'ci', 'deps' or 'code') for a file path."""
+    if CI_PATH.search(path):
+        return "ci"
+    if DEPS_PATH.search(path):
+        return "deps"
+    if TEST_PATH.search(path):
+        return "test"
+    if DOCS_PATH.search(path):
+        return "docs"
+    return "code"
+
+def extract_symbols(lines):
+    """Return the ordered, de-duplicated symbol names defined in the given lines."""
+    symbols = []
+    for line in lines:
+        for pattern in SYMBOL_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                if match.group(1) not in symbols:
+                    symbols.append(match.group(1))
+                break
+    return symbols
+
+def _join_names(names):
+    """Join names as 'a', 'a and b' or 'a, b and c'."""
+    if len(names) == 1:
+        return names[0]
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+def _fit_subject(verb, names, fallback):
+    """Build the longest '<verb> <names>' subject that stays within the limit."""
+    for count in range(len(names), 0, -1):
+        shown = names[:count]
+        if count < len(names):
+            shown = shown + [f"{len(names) - count} more"]
+        subject = f"{verb} {_join_names(shown)}"
+        if len(subject) <= SUBJECT_LIMIT:
+            return subject
+    return f"{verb} {fallback}"[:SUBJECT_LIMIT]
+
+def _describe_target(files):
+    """Describe the touched files as a single path, a shared directory or a count."""
+    if len(files) == 1:
+        return os.path.basename(files[0]["path"])
+    directories = {os.path.dirname(f["path"]) for f in files}
+    if len(directories) == 1 and next(iter(directories)):
+        return f"{next(iter(directories))}/"
+    return f"{len(files)} files"
+
+def generate_heuristic_message(context, changes):
+    """Build a deterministic commit message locally from the diff and repository stats."""
+    files = changes["staged_files"] if changes["has_staged"] else changes["unstaged_files"]
+    if not files:
+        files = [{"path": path, "status": "modified", "added": 0, "removed": 0,
+                  "added_lines": [], "removed_lines": []} for path in context.get("changed_files", [])]
+    if not files:
+        return "chore: Update files"
+
+    # Infer the type from paths when every file falls into the same category
+    categories = {classify_path(f["path"]) for f in files}
+    scope = None
+    if categories == {"test"}:
+        commit_type = "test"
+    elif categories == {"docs"}:
+        commit_type = "docs"
+    elif categories == {"ci"}:
+        commit_type = "ci"
+    elif categories == {"deps"}:
+        commit_type, scope = "chore", "deps"
+    else:
+        commit_type = None
+
+    # Infer the verb from added, removed and changed symbols
+    added_symbols, removed_symbols, changed_symbols = [], [], []
+    for f in files:
+        plus = extract_symbols(f["added_lines"])
+        minus = extract_symbols(f["removed_lines"])
+        added_symbols += [s for s in plus if s not in minus and s not in added_symbols]
+        removed_symbols += [s for s in minus if s not in plus and s not in removed_symbols]
+        changed_symbols += [s for s in plus if s in minus and s not in changed_symbols]
+
+    statuses = {f["status"] for f in files}
+    target = _describe_target(files)
+    if statuses == {"added"}:
+        verb, names = "Add", [os.path.basename(f["path"]) for f in files]
+        commit_type = commit_type or "feat"
+    elif statuses == {"deleted"}:
+        verb, names = "Remove", [os.path.basename(f["path"]) for f in files]
+        commit_type = commit_type or "chore"
+    elif statuses == {"renamed"}:
+        verb, names = "Rename", [os.path.basename(f["old_path"]) for f in files]
+        commit_type = commit_type or "refactor"
+    elif added_symbols and not removed_symbols:
+        verb, names = "Add", added_symbols
+        commit_type = commit_type or "feat"
+    elif removed_symbols and not added_symbols:
+        verb, names = "Remove", removed_symbols
+        commit_type = commit_type or "refactor"
+    elif added_symbols or changed_symbols:
+        verb, names = "Update", changed_symbols + added_symbols
+        commit_type = commit_type or "refactor"
+    else:
+        verb, names = "Update", [target]
+        commit_type = commit_type or "chore"
+
+    prefix = f"{commit_type}({scope})" if scope else commit_type
+    subject = _fit_subject(verb, names, target)
+
+    # Body: one line per file with its line counts
+    body_lines = []
+    if len(files) > 1 or added_symbols or removed_symbols:
+        for f in files:
+            line = f"- {f['path']} ({f['status']}, +{f['added']}/-{f['removed']})"
+            body_lines.append(line[:72])
+
+    message = f"{prefix}: {subject}"
+    if body_lines:
+        message += "\n\n" + "\n".join(body_lines)
+    return message
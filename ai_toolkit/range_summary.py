@@ -0,0 +1,239 @@
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, init
+
+from .ai_service import summarize_diff, check_api_key
+from .cache import cache_get, cache_put
+from .config_manager import load_config
+from .git_utils import find_git_root, git_read_command
+from .ui_utils import Spinner
+from .utils import parse_commit_message
+
+# Initialize colorama
+init(autoreset=True)
+
+# Per-commit diffs are truncated so one huge commit cannot blow the context window
+MAX_COMMIT_DIFF_CHARS = 12000
+# Number of commit summaries combined in one reduce call before going another level up
+REDUCE_BATCH_SIZE = 60
+# Condensing a batch and writing the description need far more room than one commit's summary;
+# a reply cut off at the limit counts as a failure
+REDUCE_MAX_TOKENS = 1500
+PR_DESCRIPTION_MAX_TOKENS = 1500
+DEFAULT_WORKERS = 8
+
+CHANGELOG_SECTIONS = [
+    ("feat", "Features"),
+    ("fix", "Bug Fixes"),
+    ("perf", "Performance"),
+    ("refactor", "Refactoring"),
+    ("docs", "Documentation"),
+    ("test", "Tests"),
+    ("style", "Style"),
+    ("chore", "Chores"),
+]
+
+COMMIT_SUMMARY_PROMPT = """You summarize a single git commit for release notes and pull request descriptions.
+
+Reply with a conventional commit style summary:
+- First line: '<type>: <summary>' where type is one of feat, fix, docs, style, refactor, perf, test, chore.
+  The summary starts with an imperative verb and stays under 72 characters.
+- Then an OPTIONAL blank line and at most two short sentences on the user-visible impact.
+Base the summary on the diff; use the original message only as a hint. No preamble, no code fences.
+"""
+
+PR_DESCRIPTION_PROMPT = """You write pull request descriptions from per-commit summaries.
+
+Reply in this format, without preamble or code fences:
+- First line: a PR title under 72 characters starting with an imperative verb.
+- A blank line, then a '## Summary' section of two to four sentences explaining what the branch does and why.
+- A '## Changes' section with one bullet per notable change, merging related commits.
+"""
+
+PARTIAL_REDUCE_PROMPT = """You condense a batch of per-commit summaries into a shorter list of bullets.
+Merge related commits, keep the conventional type prefix on each bullet, drop trivial chores.
+Reply with bullets only, no preamble.
+"""
+
+def create_range_parser(command):
+    """Create argument parser for the 'pr' and 'changelog' subcommands."""
+    config = load_config()
+    if command == "pr":
+        parser = argparse.ArgumentParser(prog="gitai pr",
+                                         description="Summarize the current branch into a pull request description.")
+        parser.add_argument("base", nargs="?", default=None,
+                            help="Base branch to compare against (default: origin's HEAD, main or master)")
+    else:
+        parser = argparse.ArgumentParser(prog="gitai changelog",
+                                         description="Summarize a commit range into grouped release notes.")
+        parser.add_argument("range", metavar="A..B",
+                            help="Commit range to summarize, e.g. v1.2.0..HEAD")
+    parser.add_argument("--model", "-m", type=str, default=config['summary_model'],
+                        help=f"OpenAI model to use (default: {config['summary_model']})")
+    parser.add_argument("--max-tokens", type=int, default=config['summary_max_tokens'],
+                        help=f"Maximum tokens per commit summary (default: {config['summary_max_tokens']})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent per-commit summaries (default: {DEFAULT_WORKERS})")
+    return parser
+
+def find_default_base(repo_path):
+    """Return origin's default branch, falling back to main or master."""
+    result = subprocess.run(git_read_command(repo_path, 'symbolic-ref', '--short', 'refs/remotes/origin/HEAD'),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode == 0 and result.stdout.strip():
+        return result.stdout.strip()
+    for candidate in ("main", "master"):
+        check = subprocess.run(git_read_command(repo_path, 'rev-parse', '--verify', '--quiet', candidate),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if check.returncode == 0:
+            return candidate
+    return None
+
+def list_range_commits(repo_path, revision_range):
+    """List non-merge commit SHAs in the range, oldest first; None if the range is invalid."""
+    result = subprocess.run(git_read_command(repo_path, 'rev-list', '--reverse', '--no-merges', revision_range),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        print(f"{Fore.RED}✗ Invalid commit range '{revision_range}': {result.stderr.strip()}")
+        return None
+    return result.stdout.split()
+
+def get_commit_message_and_diff(repo_path, sha):
+    """Return the original commit message and its (truncated) patch."""
+    result = subprocess.run(git_read_command(repo_path, 'show', '--no-color', '--format=%B%x00', sha),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace')
+    message, _, diff = result.stdout.partition('\x00')
+    if len(diff) > MAX_COMMIT_DIFF_CHARS:
+        diff = diff[:MAX_COMMIT_DIFF_CHARS] + "\n[... diff truncated ...]\n"
+    return message.strip(), diff.strip()
+
+def summarize_commit(repo_path, sha, model, max_tokens, errors=None):
+    """Summarize one commit, reusing the cached summary for its SHA when available."""
+    cached = cache_get("commits", sha)
+    if cached:
+        return cached
+
+    message, diff = get_commit_message_and_diff(repo_path, sha)
+    user_prompt = f"ORIGINAL MESSAGE:\n{message}\n\nDIFF:\n{diff}"
+    summary = summarize_diff(user_prompt, COMMIT_SUMMARY_PROMPT, model=model,
+                             max_tokens=max_tokens, show_spinner=False, errors=errors)
+    if not summary:
+        return None
+
+    parsed = parse_commit_message(summary)
+    entry = {"sha": sha, "type": parsed["type"], "title": parsed["title"], "body": parsed["body"]}
+    cache_put("commits", sha, entry)
+    return entry
+
+def summarize_commits(repo_path, shas, model, max_tokens, workers):
+    """Summarize every commit concurrently; only SHAs missing from the cache cost API calls."""
+    uncached = sum(1 for sha in shas if cache_get("commits", sha) is None)
+    spinner = Spinner(f"Summarizing {len(shas)} commits ({len(shas) - uncached} cached)")
+    spinner.start()
+
+    # Workers collect their errors so concurrent failures do not print over the spinner
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda sha: summarize_commit(repo_path, sha, model, max_tokens, errors), shas))
+
+    summaries = [entry for entry in results if entry]
+    failed = len(shas) - len(summaries)
+    if failed:
+        spinner.stop(False, f"Summarized {len(summaries)} commits, {failed} failed")
+    else:
+        spinner.stop(True, f"Summarized {len(summaries)} commits ({uncached} new)")
+    for line in errors:
+        print(line)
+    return summaries
+
+def format_summary_line(entry):
+    """Render a commit summary as a single bullet with its short SHA."""
+    return f"- {entry['type']}: {entry['title']} ({entry['sha'][:7]})"
+
+def reduce_summaries(lines, model, workers, errors=None):
+    """Reduce summary bullets hierarchically until they fit into one final prompt."""
+    while len(lines) > REDUCE_BATCH_SIZE:
+        batches = [lines[i:i + REDUCE_BATCH_SIZE] for i in range(0, len(lines), REDUCE_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            reduced = list(pool.map(
+                lambda batch: summarize_diff("\n".join(batch), PARTIAL_REDUCE_PROMPT, model=model,
+                                             max_tokens=REDUCE_MAX_TOKENS, show_spinner=False, errors=errors),
+                batches))
+        # Keep a failed batch's raw bullets rather than losing them
+        reduced_lines = [line for batch, text in zip(batches, reduced)
+                         for line in (text.splitlines() if text else batch) if line.strip()]
+        if len(reduced_lines) >= len(lines):
+            break # No progress (e.g. every batch failed); send what we have
+        lines = reduced_lines
+    return lines
+
+def build_changelog(summaries):
+    """Group commit summaries into release notes by conventional commit type."""
+    known_types = {commit_type for commit_type, _ in CHANGELOG_SECTIONS}
+    sections = []
+    for commit_type, heading in CHANGELOG_SECTIONS + [(None, "Other")]:
+        if commit_type is None:
+            entries = [e for e in summaries if e["type"] not in known_types]
+        else:
+            entries = [e for e in summaries if e["type"] == commit_type]
+        if entries:
+            section = f"### {heading}\n" + "\n".join(f"- {e['title']} ({e['sha'][:7]})" for e in entries)
+            sections.append(section)
+    return "\n\n".join(sections)
+
+def build_pr_description(summaries, model, workers):
+    """Reduce commit summaries into a pull request title and description."""
+    spinner = Spinner("Writing pull request description")
+    spinner.start()
+    errors = []
+    lines = reduce_summaries([format_summary_line(e) for e in summaries], model, workers, errors)
+    user_prompt = "COMMIT SUMMARIES:\n" + "\n".join(lines)
+    description = summarize_diff(user_prompt, PR_DESCRIPTION_PROMPT, model=model,
+                                 max_tokens=PR_DESCRIPTION_MAX_TOKENS, show_spinner=False, errors=errors)
+    spinner.stop(bool(description), "Pull request description written" if description else None)
+    for line in errors:
+        print(line)
+    return description
+
+def main(command, argv):
+    """Entry point for 'gitai pr' and 'gitai changelog'."""
+    args = create_range_parser(command).parse_args(argv)
+
+    repo_path = find_git_root()
+    if not repo_path:
+        sys.exit(1)
+    if not check_api_key():
+        sys.exit(1)
+
+    if command == "pr":
+        base = args.base or find_default_base(repo_path)
+        if not base:
+            print(f"{Fore.RED}✗ Could not determine a base branch.")
+            print(f"{Fore.YELLOW}  → Pass one explicitly, e.g. 'gitai pr main'.")
+            sys.exit(1)
+        revision_range = f"{base}..HEAD"
+    else:
+        revision_range = args.range
+
+    shas = list_range_commits(repo_path, revision_range)
+    if shas is None:
+        sys.exit(1)
+    if not shas:
+        print(f"{Fore.YELLOW}⚠ No commits found in {revision_range}.")
+        sys.exit(0)
+
+    summaries = summarize_commits(repo_path, shas, args.model, args.max_tokens, args.workers)
+    if not summaries:
+        print(f"{Fore.RED}✗ Failed to summarize any commits.")
+        sys.exit(1)
+
+    if command == "pr":
+        description = build_pr_description(summaries, args.model, args.workers)
+        if not description:
+            print(f"{Fore.RED}✗ Failed to generate the pull request description.")
+            sys.exit(1)
+        print("\n" + description.strip())
+    else:
+        print("\n" + build_changelog(summaries))
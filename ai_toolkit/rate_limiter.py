@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import time
+
+from .setup import CONFIG_DIR
+
+# Shared state for every gitai process on this host
+LIMITER_DB = CONFIG_DIR / "ratelimit.sqlite3"
+# How often a queued caller re-checks whether it has been granted capacity
+POLL_INTERVAL = 0.1
+# How often a queued caller refreshes its heartbeat and drops tickets of dead processes
+MAINTENANCE_INTERVAL = 5
+# Tickets whose owner has not checked in for this long are dropped (crashed or killed process)
+STALE_TICKET_SECONDS = 30
+
+def _connect():
+    """Open the limiter database, creating its tables on first use."""
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(LIMITER_DB), timeout=30, isolation_level=None)
+    # WAL lets waiters check for a grant while another caller holds the write lock
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS bucket ("
+                 "id INTEGER PRIMARY KEY CHECK (id = 1), requests REAL, tokens REAL, updated REAL)")
+    # The queue only holds in-flight waiters, so a table from an older layout is simply replaced
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(queue)")}
+    if columns and "granted" not in columns:
+        conn.execute("DROP TABLE queue")
+    conn.execute("CREATE TABLE IF NOT EXISTS queue ("
+                 "ticket INTEGER PRIMARY KEY AUTOINCREMENT, pid INTEGER, heartbeat REAL, "
+                 "tokens REAL, granted INTEGER DEFAULT 0)")
+    return conn
+
+def _pid_alive(pid):
+    """Return True if a process with this pid still exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True # Exists but belongs to another user
+    return True
+
+def _refill(conn, rpm, tpm, now):
+    """Refill both buckets for the time elapsed since the last update and return (requests, tokens)."""
+    row = conn.execute("SELECT requests, tokens, updated FROM bucket WHERE id = 1").fetchone()
+    if row is None:
+        requests, tokens = float(rpm), float(tpm)
+        conn.execute("INSERT INTO bucket (id, requests, tokens, updated) VALUES (1, ?, ?, ?)",
+                     (requests, tokens, now))
+        return requests, tokens
+
+    requests, tokens, updated = row
+    elapsed = max(0.0, now - updated)
+    requests = min(float(rpm), requests + elapsed * rpm / 60.0)
+    tokens = min(float(tpm), tokens + elapsed * tpm / 60.0)
+    conn.execute("UPDATE bucket SET requests = ?, tokens = ?, updated = ? WHERE id = 1",
+                 (requests, tokens, now))
+    return requests, tokens
+
+def _prune_stale(conn, now):
+    """Drop tickets whose owner crashed or stopped checking in."""
+    for ticket, pid, heartbeat in conn.execute("SELECT ticket, pid, heartbeat FROM queue").fetchall():
+        if now - heartbeat > STALE_TICKET_SECONDS or not _pid_alive(pid):
+            conn.execute("DELETE FROM queue WHERE ticket = ?", (ticket,))
+
+def _grant(conn, rpm, tpm, now):
+    """Grant waiting tickets in order while capacity lasts; returns the (requests, tokens) left over.
+
+    Stops at the first ticket that does not fit, so later callers never overtake it.
+    """
+    requests, tokens = _refill(conn, rpm, tpm, now)
+    waiting = conn.execute("SELECT ticket, tokens FROM queue WHERE granted = 0 ORDER BY ticket").fetchall()
+    for ticket, needed in waiting:
+        if (rpm > 0 and requests < 1) or (tpm > 0 and tokens < needed):
+            break
+        requests -= 1 if rpm > 0 else 0
+        tokens -= needed
+        conn.execute("UPDATE queue SET granted = 1 WHERE ticket = ?", (ticket,))
+    conn.execute("UPDATE bucket SET requests = ?, tokens = ? WHERE id = 1", (requests, tokens))
+    return requests, tokens
+
+def _queue_position(conn, ticket):
+    """Return (granted, is_head) for a ticket; a pruned ticket counts as granted so its owner is not stuck."""
+    row = conn.execute("SELECT granted FROM queue WHERE ticket = ?", (ticket,)).fetchone()
+    if row is None:
+        return True, False
+    head = conn.execute("SELECT MIN(ticket) FROM queue WHERE granted = 0").fetchone()[0]
+    return bool(row[0]), head == ticket
+
+def acquire(estimated_tokens, rpm, tpm, on_wait=None):
+    """Block until this process may send one request of estimated_tokens.
+
+    Callers across all processes are served first come, first served. A limit
+    of 0 disables that bucket. on_wait is called once if the caller has to
+    queue. Returns the number of seconds spent waiting.
+    """
+    if rpm <= 0 and tpm <= 0:
+        return 0.0
+
+    started = time.monotonic()
+    # A request larger than the whole budget would never fit; let it through once the bucket is full
+    estimated_tokens = min(estimated_tokens, tpm) if tpm > 0 else 0
+    try:
+        conn = _connect()
+    except (OSError, sqlite3.Error):
+        return 0.0 # Never block generation because the limiter state is unavailable
+
+    ticket = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        cursor = conn.execute("INSERT INTO queue (pid, heartbeat, tokens) VALUES (?, ?, ?)",
+                              (os.getpid(), now, estimated_tokens))
+        ticket = cursor.lastrowid
+        # Whoever holds the lock hands out capacity to everyone it covers, including itself
+        requests, tokens = _grant(conn, rpm, tpm, now)
+        granted, head = _queue_position(conn, ticket)
+        conn.execute("COMMIT")
+        last_maintenance = time.monotonic()
+
+        while not granted:
+            if on_wait:
+                on_wait()
+                on_wait = None
+
+            # The head sleeps until its bucket refills; everyone else only checks for a grant
+            delay = POLL_INTERVAL
+            if head:
+                request_wait = 0 if rpm <= 0 or requests >= 1 else (1 - requests) * 60.0 / rpm
+                token_wait = 0 if tpm <= 0 or tokens >= estimated_tokens else (estimated_tokens - tokens) * 60.0 / tpm
+                delay = max(POLL_INTERVAL, request_wait, token_wait)
+            time.sleep(min(delay, 1.0))
+
+            maintenance_due = time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL
+            if not head and not maintenance_due:
+                granted, head = _queue_position(conn, ticket)
+                continue
+
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            if maintenance_due:
+                conn.execute("UPDATE queue SET heartbeat = ? WHERE ticket = ?", (now, ticket))
+                _prune_stale(conn, now)
+                last_maintenance = time.monotonic()
+            requests, tokens = _grant(conn, rpm, tpm, now)
+            granted, head = _queue_position(conn, ticket)
+            conn.execute("COMMIT")
+        return time.monotonic() - started
+    except sqlite3.Error:
+        return time.monotonic() - started
+    finally:
+        # Leave the queue even when interrupted so later callers are not stuck behind us
+        try:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if ticket is not None:
+                conn.execute("DELETE FROM queue WHERE ticket = ?", (ticket,))
+        except sqlite3.Error:
+            pass
+        conn.close()
+
+def reconcile(estimated_tokens, actual_tokens, tpm):
+    """Charge the token bucket for the difference between the estimate and actual usage."""
+    if tpm <= 0 or not actual_tokens:
+        return
+    try:
+        conn = _connect()
+    except (OSError, sqlite3.Error):
+        return
+    try:
+        conn.execute("UPDATE bucket SET tokens = tokens - ? WHERE id = 1",
+                     (actual_tokens - min(estimated_tokens, tpm),))
+    except sqlite3.Error:
+        pass
+    finally:
+        conn.close()
@@ -0,0 +1,58 @@
+from .utils import split_diff_by_file, estimate_tokens, count_file_types
+
+# Weights for the complexity score; a one-line fix scores around 5, a large refactor in the hundreds
+FILE_WEIGHT = 2.0
+HUNK_WEIGHT = 1.0
+LANGUAGE_WEIGHT = 3.0
+TOKENS_PER_POINT = 200
+
+def parse_tiers(spec, default_model, default_max_tokens):
+    """Parse 'name:model:max_tokens:max_score, ...' into tier dicts ordered by score ceiling.
+
+    'default' as model or max_tokens uses the configured summary value; a
+    max_score of 0 means unbounded.
+    """
+    tiers = []
+    for item in spec.split(','):
+        parts = [part.strip() for part in item.split(':')]
+        if len(parts) != 4 or not parts[0]:
+            continue
+        name, model, max_tokens, max_score = parts
+        try:
+            tiers.append({
+                "name": name,
+                "model": default_model if model == "default" else model,
+                "max_tokens": default_max_tokens if max_tokens == "default" else int(max_tokens),
+                "max_score": float(max_score) or float('inf')
+            })
+        except ValueError:
+            continue
+    return sorted(tiers, key=lambda tier: tier["max_score"])
+
+def score_complexity(context, changes):
+    """Score how hard the collected changes are to summarize."""
+    submodule_diff = "".join(submodule["diff"] for submodule in changes.get("submodules", []))
+    files = changes["staged_files"] + changes["unstaged_files"] + split_diff_by_file(submodule_diff)
+    hunks = sum(f["hunks"] for f in files)
+    # Count languages in the diff being scored; context['file_types'] only covers unstaged files
+    languages = len(count_file_types(f["path"] for f in files))
+    tokens = estimate_tokens(changes["staged"] + changes["unstaged"] + submodule_diff)
+    score = (len(files) * FILE_WEIGHT + hunks * HUNK_WEIGHT
+             + languages * LANGUAGE_WEIGHT + tokens / TOKENS_PER_POINT)
+    return {
+        "score": round(score, 1),
+        "files": len(files),
+        "hunks": hunks,
+        "languages": languages,
+        "tokens": tokens
+    }
+
+def route_model(context, changes, tiers):
+    """Pick the first tier whose score ceiling covers the changes; None if no tiers are configured."""
+    if not tiers:
+        return None
+    complexity = score_complexity(context, changes)
+    for tier in tiers:
+        if complexity["score"] <= tier["max_score"]:
+            break
+    return dict(tier, complexity=complexity)
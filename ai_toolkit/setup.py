@@ -19,6 +19,17 @@ DEFAULT_SUMMARY_MAX_TOKENS = 300
 DEFAULT_DESCRIPTION_MODEL = "gpt-4.1-mini-2025-04-14"
 DEFAULT_DESCRIPTION_MAX_TOKENS = 400
 DEFAULT_COMMAND_BEHAVIOR = "default"  # options: default, stage, stage_push
+DEFAULT_AI_DEADLINE = 10.0  # seconds before the local draft is shown; 0 waits for the AI
+DEFAULT_RATE_LIMIT_RPM = 0  # requests per minute shared by all gitai processes; 0 = unlimited
+DEFAULT_RATE_LIMIT_TPM = 0  # tokens per minute shared by all gitai processes; 0 = unlimited
+DEFAULT_SUBMODULE_MAX_TOKENS = 1500  # prompt budget for each changed submodule
+DEFAULT_SUBMODULE_WORKERS = 8
+DEFAULT_INCREMENTAL_ENABLED = True
+DEFAULT_INCREMENTAL_MIN_FILES = 5  # staged files before per-file notes are cached and combined
+DEFAULT_ENRICHMENT_ENABLED = True  # add enclosing function/class signatures of each hunk to the prompt
+DEFAULT_ROUTING_ENABLED = True
+# name:model:max_tokens:max_score; 'default' uses the summary model/tokens, max_score 0 is unbounded
+DEFAULT_ROUTING_TIERS = "small:gpt-4.1-nano-2025-04-14:150:15, medium:default:default:80, large:gpt-4.1-2025-04-14:500:0"
 
 def ensure_config_dir_exists():
     """Ensure the configuration directory exists."""
@@ -46,6 +57,36 @@ def save_config(config_data):
     config['AI']['description_model'] = config_data.get('description_model', DEFAULT_DESCRIPTION_MODEL)
     config['AI']['description_max_tokens'] = str(config_data.get('description_max_tokens', DEFAULT_DESCRIPTION_MAX_TOKENS))
     config['AI']['default_command_behavior'] = config_data.get('default_command_behavior', DEFAULT_COMMAND_BEHAVIOR)
+    config['AI']['ai_deadline'] = str(config_data.get('ai_deadline', DEFAULT_AI_DEADLINE))
+
+    # Update RateLimit section
+    if 'RateLimit' not in config:
+        config['RateLimit'] = {}
+    config['RateLimit']['requests_per_minute'] = str(config_data.get('rate_limit_rpm', DEFAULT_RATE_LIMIT_RPM))
+    config['RateLimit']['tokens_per_minute'] = str(config_data.get('rate_limit_tpm', DEFAULT_RATE_LIMIT_TPM))
+
+    # Update Submodules section
+    if 'Submodules' not in config:
+        config['Submodules'] = {}
+    config['Submodules']['max_tokens'] = str(config_data.get('submodule_max_tokens', DEFAULT_SUBMODULE_MAX_TOKENS))
+    config['Submodules']['workers'] = str(config_data.get('submodule_workers', DEFAULT_SUBMODULE_WORKERS))
+
+    # Update Incremental section
+    if 'Incremental' not in config:
+        config['Incremental'] = {}
+    config['Incremental']['enabled'] = str(config_data.get('incremental_enabled', DEFAULT_INCREMENTAL_ENABLED)).lower()
+    config['Incremental']['min_files'] = str(config_data.get('incremental_min_files', DEFAULT_INCREMENTAL_MIN_FILES))
+
+    # Update Enrichment section
+    if 'Enrichment' not in config:
+        config['Enrichment'] = {}
+    config['Enrichment']['enabled'] = str(config_data.get('enrichment_enabled', DEFAULT_ENRICHMENT_ENABLED)).lower()
+
+    # Update Routing section
+    if 'Routing' not in config:
+        config['Routing'] = {}
+    config['Routing']['enabled'] = str(config_data.get('routing_enabled', DEFAULT_ROUTING_ENABLED)).lower()
+    config['Routing']['tiers'] = config_data.get('routing_tiers', DEFAULT_ROUTING_TIERS)
 
     try:
         with open(CONFIG_FILE, 'w') as configfile:
@@ -73,6 +114,18 @@ def get_int_input_with_default(prompt, default):
             print(f"{Fore.RED}"
                   f"✗ Please enter a valid integer.")
 
+def get_float_input_with_default(prompt, default):
+    """Helper function to get numeric input with a default."""
+    while True:
+        user_input = input(f"{Fore.WHITE}{prompt} [{default}]: ").strip()
+        if not user_input:
+            return default
+        try:
+            return float(user_input)
+        except ValueError:
+            print(f"{Fore.RED}"
+                  f"✗ Please enter a valid number.")
+
 def main():
     parser = argparse.ArgumentParser(description="Set up the Git AI Toolkit configuration.")
     from .config_manager import load_config
@@ -120,6 +173,24 @@ def main():
     description_max_tokens = get_int_input_with_default(
         "Max tokens for description", DEFAULT_DESCRIPTION_MAX_TOKENS
     )
+    ai_deadline = get_float_input_with_default(
+        "Seconds to wait for AI before showing a local draft (0 = wait)", DEFAULT_AI_DEADLINE
+    )
+
+    routing_choice = get_input_with_default(
+        "Route small diffs to a faster model and large ones to a stronger one (y/n)",
+        "y" if config.get('routing_enabled', DEFAULT_ROUTING_ENABLED) else "n"
+    )
+
+    # --- Shared Rate Limit ---
+    print(f"\n{Fore.CYAN}--- Shared Rate Limit ---")
+    print(f"{Fore.YELLOW}Budget shared by all gitai processes on this machine (0 = unlimited).")
+    rate_limit_rpm = get_int_input_with_default(
+        "Requests per minute", config.get('rate_limit_rpm', DEFAULT_RATE_LIMIT_RPM)
+    )
+    rate_limit_tpm = get_int_input_with_default(
+        "Tokens per minute", config.get('rate_limit_tpm', DEFAULT_RATE_LIMIT_TPM)
+    )
 
     # --- Default Command Behavior ---
     print(f"\n{Fore.CYAN}--- Default Command Behavior ---")
@@ -138,7 +209,17 @@ def main():
         "summary_max_tokens": summary_max_tokens,
         "description_model": description_model,
         "description_max_tokens": description_max_tokens,
-        "default_command_behavior": default_behavior
+        "default_command_behavior": default_behavior,
+        "ai_deadline": ai_deadline,
+        "rate_limit_rpm": rate_limit_rpm,
+        "rate_limit_tpm": rate_limit_tpm,
+        "routing_enabled": routing_choice.lower().startswith('y'),
+        "routing_tiers": config.get('routing_tiers', DEFAULT_ROUTING_TIERS),
+        "submodule_max_tokens": config.get('submodule_max_tokens', DEFAULT_SUBMODULE_MAX_TOKENS),
+        "submodule_workers": config.get('submodule_workers', DEFAULT_SUBMODULE_WORKERS),
+        "incremental_enabled": config.get('incremental_enabled', DEFAULT_INCREMENTAL_ENABLED),
+        "incremental_min_files": config.get('incremental_min_files', DEFAULT_INCREMENTAL_MIN_FILES),
+        "enrichment_enabled": config.get('enrichment_enabled', DEFAULT_ENRICHMENT_ENABLED)
     }
     save_config(config_data)
 
@@ -10,16 +10,24 @@ init(autoreset=True)
 # Progress indicators
 class Spinner:
     """Simple spinner for showing progress during long-running operations."""
-    def __init__(self, message="Working", delay=0.1):
+    # Set to False for automation runs; spinners then only print their final status line
+    interactive = True
+
+    def __init__(self, message="Working", delay=0.1, enabled=True):
         self.spinner_chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
         self.message = message
         self.delay = delay
+        self.enabled = enabled
         self.running = False
         self.spinner_index = 0
         self._thread = None
 
     def start(self):
+        if not self.enabled:
+            return
         self.running = True
+        if not (Spinner.interactive and sys.stdout.isatty()):
+            return # No animation thread without a terminal
         self.spinner_index = 0
         print(f"\r{Fore.YELLOW}{self.message} {self.spinner_chars[0]}", end="")
         sys.stdout.flush()
@@ -41,6 +49,8 @@ class Spinner:
         pass
 
     def stop(self, success=True, message=None):
+        if not self.enabled:
+            return
         self.running = False
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=0.2)  # Wait for thread to finish
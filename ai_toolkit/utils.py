@@ -1,107 +1,318 @@
+import json
+import os
 import re
 from colorama import init
 
 # Initialize colorama
 init(autoreset=True)
 
+def estimate_tokens(text):
+    """Roughly estimate the token count of text (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text, max_tokens):
+    """Trim text to roughly max_tokens, marking the cut."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "\n[... truncated ...]\n"
+
 def parse_commit_message(message):
     """Parse the AI-generated commit message into title, body, and type."""
     lines = message.strip().split('\n')
     if not lines:
-        return {"title": "", "body": "", "type": "unknown", "prefix": ""}
+        return {"title": "", "body": "", "type": "unknown", "prefix": "", "scope": "", "breaking": False}
     
     # Extract the subject line (first line)
     subject = lines[0].strip()
     
     # Simple type extraction: Look for common prefixes like feat:, fix:, etc.
-    match = re.match(r"^(\w+)(?:\(.+?\))?(!?):\s*(.*)", subject)
+    match = re.match(r"^(\w+)(?:\((.+?)\))?(!?):\s*(.*)", subject)
     commit_type = "unknown"
     commit_prefix = ""
+    scope = ""
+    breaking = False
     if match:
         commit_type = match.group(1).lower()
-        commit_prefix = match.group(1) + (match.group(2) if match.group(2) else "")
-        subject = match.group(3).strip()
+        scope = match.group(2) or ""
+        breaking = bool(match.group(3))
+        commit_prefix = match.group(1) + (f"({scope})" if scope else "") + match.group(3)
+        subject = match.group(4).strip()
     
     # The rest is the body
     body = "\n".join(lines[1:]).strip()
     if body and body.startswith("\n"):
         body = body.lstrip('\n')
     
-    return {"title": subject, "body": body, "type": commit_type, "prefix": commit_prefix}
+    return {"title": subject, "body": body, "type": commit_type, "prefix": commit_prefix,
+            "scope": scope, "breaking": breaking}
+
+COMMIT_TYPES = ["feat", "fix", "docs", "style", "refactor", "perf", "test", "chore"]
+
+# Structured output schema for commit messages; strict mode requires every field, so "" means none
+COMMIT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "commit_message",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": COMMIT_TYPES},
+                "scope": {"type": "string"},
+                "subject": {"type": "string"},
+                "body": {"type": "string"},
+                "breaking": {"type": "boolean"}
+            },
+            "required": ["type", "scope", "subject", "body", "breaking"],
+            "additionalProperties": False
+        }
+    }
+}
+
+def parse_structured_commit(text):
+    """Validate a JSON commit message against COMMIT_RESPONSE_FORMAT; None if it does not conform."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("type") not in COMMIT_TYPES:
+        return None
+    # Tolerate null for the optional fields from models without strict schema support
+    fields = [data.get(key) or "" for key in ("scope", "subject", "body")]
+    if not all(isinstance(field, str) for field in fields) or not isinstance(data.get("breaking"), bool):
+        return None
+    scope, subject, body = (field.strip() for field in fields)
+    if not subject:
+        return None
+
+    prefix = data["type"] + (f"({scope})" if scope else "") + ("!" if data["breaking"] else "")
+    full_message = f"{prefix}: {subject}" + (f"\n\n{body}" if body else "")
+    return {"title": subject, "body": body, "type": data["type"], "prefix": prefix,
+            "scope": scope, "breaking": data["breaking"], "full_message": full_message}
+
+def split_diff_by_file(diff_text):
+    """Split a unified diff into per-file entries with path, status and line counts.
+
+    Parse once per diff and pass the entries along; large diffs make this noticeable.
+    """
+    files = []
+    current = None
+    current_lines = []
+    in_hunk = False
+    for line in diff_text.splitlines():
+        if line.startswith('diff --git '):
+            if current is not None:
+                current["diff"] = "".join(current_lines)
+            match = re.match(r"^diff --git a/(.*) b/(.*)$", line)
+            old_path, new_path = match.groups() if match else ("", "")
+            current = {
+                "path": new_path,
+                "old_path": old_path,
+                "status": "modified",
+                "hunks": 0,
+                "added": 0,
+                "removed": 0,
+                "added_lines": [],
+                "removed_lines": [],
+                "diff": ""
+            }
+            # Joined once per file; appending to a string per line is quadratic in the file's size
+            current_lines = [line + "\n"]
+            files.append(current)
+            in_hunk = False
+            continue
+        if current is None:
+            continue
+
+        current_lines.append(line + "\n")
+        if line.startswith('@@'):
+            current["hunks"] += 1
+            in_hunk = True
+        elif not in_hunk:
+            # Extended header lines between "diff --git" and the first hunk
+            if line.startswith('new file mode'):
+                current["status"] = "added"
+            elif line.startswith('deleted file mode'):
+                current["status"] = "deleted"
+            elif line.startswith('rename from '):
+                current["status"] = "renamed"
+                current["old_path"] = line[len('rename from '):]
+            elif line.startswith('rename to '):
+                current["path"] = line[len('rename to '):]
+        elif line.startswith('+'):
+            current["added"] += 1
+            current["added_lines"].append(line[1:])
+        elif line.startswith('-'):
+            current["removed"] += 1
+            current["removed_lines"].append(line[1:])
+
+    if current is not None:
+        current["diff"] = "".join(current_lines)
+    return files
+
+def count_file_types(paths):
+    """Count changed files per extension to understand languages/components being modified."""
+    file_types = {}
+    for path in paths:
+        ext = os.path.splitext(path)[1]
+        if ext:
+            file_types[ext] = file_types.get(ext, 0) + 1
+    return file_types
+
+def build_context_from_diff(files, branch="unknown"):
+    """Build a repository context dict from parsed diff entries when no live repository is available."""
+    changed_files = [f["path"] for f in files]
+    stats = "".join(f" {f['path']} | +{f['added']} -{f['removed']}\n" for f in files)
+    return {
+        "branch": branch,
+        "stats": stats,
+        "file_types": count_file_types(changed_files),
+        "changed_files": changed_files
+    }
+
+def format_submodule_section(submodule):
+    """Render one submodule's changes as its own prompt section."""
+    state = []
+    if submodule["old"] != submodule["new"]:
+        state.append(f"{submodule['old'][:7]} -> {submodule['new'][:7]}")
+    if submodule["dirty"]:
+        state.append("uncommitted changes")
+    section = f"\n\nSUBMODULE {submodule['path']} ({', '.join(state)}):\n"
+    if submodule["log"]:
+        section += f"Commits:\n{submodule['log']}\n"
+    if submodule["diff"]:
+        section += f"Diff:\n{submodule['diff']}"
+    return section
+
+# Everything static lives in the system prompt so it forms a byte-identical prefix across runs and
+# repositories, which providers cache automatically; the user prompt carries only volatile content
+COMMIT_SYSTEM_PROMPT = """You are an expert at writing concise, human-like git commit messages following best practices:
+
+1. Format Requirements:
+   - Start with an imperative verb (Add, Fix, Update, Refactor, etc.)
+   - First line (subject) MUST be under 50 characters. Be brief.
+   - No period at end of summary line.
+   - Only capitalize first word and proper nouns in the subject.
+   - Include a detailed body ONLY IF NECESSARY to explain the 'why'. If the subject is self-explanatory for the changes, omit the body.
+   - Body lines wrapped at 72 characters.
+   - AVOID sounding like an AI. Write like a human developer. Use direct and active language.
+   - AVOID phrases like "This commit...", "This change...", "The code was updated to...". Go straight to the point.
+
+2. Commit Classification (use appropriate type):
+   - feat: New feature addition
+   - fix: Bug fix
+   - docs: Documentation changes
+   - style: Code style/formatting changes (not affecting logic)
+   - refactor: Code changes that neither fix bugs nor add features
+   - perf: Performance improvements
+   - test: Adding or modifying tests
+   - chore: Maintenance tasks, dependency updates, etc.
+
+3. Choosing the Type:
+   - Pick the type from the effect on users of the code, not from the files touched.
+   - A change that makes previously wrong behavior correct is fix, even if it adds code.
+   - New behavior, options, commands or endpoints are feat, even if small.
+   - Moving, renaming or restructuring code without changing behavior is refactor.
+   - Changes whose only purpose is speed, memory or fewer requests are perf.
+   - Changes only to tests are test; tests added alongside a feature or fix belong to that type.
+   - Changes only to README files, docstrings or comments are docs.
+   - Whitespace, formatting and import ordering without logic changes are style.
+   - Build scripts, CI configuration, version bumps and dependency updates are chore.
+   - If the diff mixes several kinds of changes, use the type of the most important one.
+
+4. Scope:
+   - Use the module, package, component or command most of the change lives in, e.g. "auth", "cli", "parser".
+   - Prefer a name that already appears in the paths or identifiers of the diff.
+   - Use lowercase and a single word; use "" when the change spans unrelated areas.
+
+5. Body:
+   - Explain the problem being solved and why this approach was taken, not a list of edited files.
+   - Mention side effects, migrations or follow-up work a reviewer should know about.
+   - Keep it to a few short sentences or bullet points starting with "- ".
+   - Separate lines with a newline character; never exceed 72 characters per line.
+
+6. Breaking Changes:
+   - Set breaking to true only when existing callers, users or configuration must change,
+     e.g. a removed or renamed public function, option, endpoint or configuration key,
+     or a changed default that alters existing behavior.
+   - When breaking is true, the body must say what breaks and how to migrate.
+
+Focus on WHY the change was made, not just WHAT changed. Be specific and factual.
+If the changes are minor (e.g., typo fix, small style adjustment), a short, direct subject line is sufficient.
+If the diff is extensive, focus on the primary purpose or the most impactful changes for the commit message.
+
+7. Reading the Input:
+   The user message contains these sections, in this order:
+   - REPOSITORY CONTEXT: the branch name and the number and types of changed files.
+     A branch name like "fix/login-timeout" or "feature/export-csv" hints at the intent.
+   - FILE CHANGES: a diffstat of the changed files.
+   - CHANGED FUNCTIONS AND CLASSES (optional): the function or class enclosing each block of
+     changes, e.g. "app.py: class Cache > def get(self, key)". Use these names in the subject
+     or body when they make the change clearer than the diff lines alone.
+   - DIFF: the staged changes, which are what gets committed, followed by unstaged changes
+     and sections for changed submodules, if any. Describe the staged changes; use unstaged
+     changes only as context. Long diffs may be truncated; do not guess at missing parts.
+
+Respond with a JSON object with these fields:
+- type: the commit type
+- scope: the affected component in one word, or "" if there is no clear one
+- subject: under 50 chars, starting with an imperative verb, without the type prefix
+- body: the WHY of the changes wrapped at 72 characters, or "" if the subject is clear
+- breaking: true only if the change breaks existing users
+
+Example 1 (simple change, no body needed):
+{"type": "fix", "scope": "", "subject": "Correct typo in README", "body": "", "breaking": false}
+
+Example 2 (more complex, body explains 'why'):
+{"type": "feat", "scope": "auth", "subject": "Add user authentication endpoint", "body": "Implement JWT-based authentication for the /login endpoint.\\nThis secures user access and lays groundwork for role-based permissions.", "breaking": false}
+
+Example 3 (refactor, concise body):
+{"type": "refactor", "scope": "users", "subject": "Simplify user data fetching logic", "body": "Consolidate user retrieval methods into a single service function\\nto reduce code duplication and improve maintainability.", "breaking": false}
+
+Example 4 (bug fix that explains the cause):
+{"type": "fix", "scope": "parser", "subject": "Handle empty lines in config files", "body": "Blank lines were treated as keys without values and raised a\\nKeyError on startup.", "breaking": false}
+
+Example 5 (breaking change with migration note):
+{"type": "feat", "scope": "cli", "subject": "Rename --out option to --output", "body": "Match the naming of the other long options.\\nScripts passing --out must switch to --output.", "breaking": true}
+
+Example 6 (performance):
+{"type": "perf", "scope": "cache", "subject": "Reuse parsed templates across requests", "body": "Parsing dominated response time for small pages; templates are now\\nparsed once per process.", "breaking": false}
+
+Example 7 (maintenance, no body needed):
+{"type": "chore", "scope": "", "subject": "Bump requests to 2.32", "body": "", "breaking": false}
+"""
 
 def create_diff_prompt(context, changes):
-    """Create a comprehensive, context-rich prompt for the AI model."""
+    """Create a comprehensive, context-rich prompt for the AI model.
+
+    Returns (system_prompt, user_prompt); the system prompt never changes between calls.
+    """
     # Combine staged and unstaged changes
     diff_content = ""
     if changes["has_staged"]:
         diff_content += f"STAGED CHANGES:\n{changes['staged']}\n\n"
     if changes["has_unstaged"]:
         diff_content += f"UNSTAGED CHANGES:\n{changes['unstaged']}"
+    for submodule in changes.get("submodules", []):
+        diff_content += format_submodule_section(submodule)
 
     if not diff_content.strip():
         return None
 
-    # Enhanced system prompt with clear formatting guidelines
-    system_prompt = """You are an expert at writing concise, human-like git commit messages following best practices:
-
-    1. Format Requirements:
-       - Start with an imperative verb (Add, Fix, Update, Refactor, etc.)
-       - First line (subject) MUST be under 50 characters. Be brief.
-       - No period at end of summary line.
-       - Only capitalize first word and proper nouns in the subject.
-       - Include a detailed body ONLY IF NECESSARY to explain the 'why'. If the subject is self-explanatory for the changes, omit the body.
-       - Body lines wrapped at 72 characters.
-       - AVOID sounding like an AI. Write like a human developer. Use direct and active language.
-       - AVOID phrases like "This commit...", "This change...", "The code was updated to...". Go straight to the point.
-
-    2. Commit Classification (use appropriate type):
-       - feat: New feature addition
-       - fix: Bug fix
-       - docs: Documentation changes
-       - style: Code style/formatting changes (not affecting logic)
-       - refactor: Code changes that neither fix bugs nor add features
-       - perf: Performance improvements
-       - test: Adding or modifying tests
-       - chore: Maintenance tasks, dependency updates, etc.
-
-    
-        Focus on WHY the change was made, not just WHAT changed. Be specific and factual.
-        If the changes are minor (e.g., typo fix, small style adjustment), a short, direct subject line is sufficient.
-        If the diff is extensive, focus on the primary purpose or the most impactful changes for the commit message.
-    """
-
-    # Context-rich user prompt
-    user_prompt = f"""Generate a clear, informative commit message for these changes:
-
-        REPOSITORY CONTEXT:
-        - Branch: {context['branch']}
-        - Files changed: {len(context['changed_files'])}
-        - File types modified: {', '.join([f'{ext} ({count})' for ext, count in context['file_types'].items()])}
-        
-        FILE CHANGES:
-        {context['stats']}
-        
-        DIFF:
-        {diff_content}
-
-        Format your response as:
-        1. A type prefix (feat/fix/docs/etc)
-        2. A clear subject line under 50 chars starting with imperative verb
-        3. An OPTIONAL detailed body explaining the WHY of the changes. Omit if subject is clear.
-        
-        Example 1 (simple change, no body needed):
-        fix: Correct typo in README
-        
-        Example 2 (more complex, body explains 'why'):
-        feat: Add user authentication endpoint
-        
-        Implement JWT-based authentication for the /login endpoint.
-        This secures user access and lays groundwork for role-based permissions.
-        
-        Example 3 (refactor, concise body):
-        refactor: Simplify user data fetching logic
-        
-        Consolidate user retrieval methods into a single service function
-        to reduce code duplication and improve maintainability.
-"""
-    return system_prompt, user_prompt 
\ No newline at end of file
+    file_types = ', '.join([f'{ext} ({count})' for ext, count in context['file_types'].items()])
+    # Volatile content only, roughly from least to most likely to change between runs
+    sections = [
+        "REPOSITORY CONTEXT:\n"
+        f"- Branch: {context['branch']}\n"
+        f"- Files changed: {len(context['changed_files'])}\n"
+        f"- File types modified: {file_types}",
+        f"FILE CHANGES:\n{context['stats']}"
+    ]
+    # Enclosing functions/classes of each changed block, when enrichment ran
+    if changes.get("scopes"):
+        sections.append("CHANGED FUNCTIONS AND CLASSES:\n" + "\n".join(f"- {scope}" for scope in changes["scopes"]))
+    sections.append(f"DIFF:\n{diff_content}")
+    user_prompt = "\n\n".join(sections)
+    return COMMIT_SYSTEM_PROMPT, user_prompt 
\ No newline at end of file
@@ -0,0 +1,226 @@
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import subprocess
+import sys
+import time
+from colorama import Fore, init
+
+from .ai_service import check_api_key
+from .config_manager import load_config
+from .file_notes import get_file_notes, combine_notes
+from .git_utils import find_git_root, get_blob_pairs, git_read_command
+from .utils import split_diff_by_file, parse_structured_commit
+
+# Initialize colorama
+init(autoreset=True)
+
+DEFAULT_INTERVAL = 2.0
+# Quiet period after a file system event before a pass runs, so a burst of saves costs one pass
+DEBOUNCE_SECONDS = 0.5
+DEFAULT_WORKERS = 4
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+def create_watch_parser():
+    """Create argument parser for the 'watch' subcommand."""
+    config = load_config()
+    parser = argparse.ArgumentParser(prog="gitai watch",
+                                     description="Keep a draft commit message up to date while you work.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between polls when inotify is unavailable (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument("--model", "-m", type=str, default=config['summary_model'],
+                        help=f"OpenAI model to use (default: {config['summary_model']})")
+    parser.add_argument("--max-tokens", type=int, default=config['summary_max_tokens'],
+                        help=f"Maximum tokens for the combined message (default: {config['summary_max_tokens']})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent per-file summaries (default: {DEFAULT_WORKERS})")
+    return parser
+
+def get_draft_path(repo_path):
+    """Return the draft file inside the repository's git dir (per worktree)."""
+    result = subprocess.run(git_read_command(repo_path, 'rev-parse', '--absolute-git-dir'),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        return None
+    return os.path.join(result.stdout.strip(), "gitai-draft.json")
+
+def load_draft(repo_path):
+    """Load the stored draft, or an empty one."""
+    draft_path = get_draft_path(repo_path)
+    try:
+        with open(draft_path, encoding='utf-8') as draft_file:
+            return json.load(draft_file)
+    except (OSError, TypeError, ValueError):
+        return {"files": {}, "message": None}
+
+def save_draft(repo_path, draft):
+    """Atomically write the draft so 'gitai' never reads a partial file."""
+    draft_path = get_draft_path(repo_path)
+    if not draft_path:
+        return
+    tmp_path = draft_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as draft_file:
+        json.dump(draft, draft_file)
+    os.replace(tmp_path, draft_path)
+
+def hash_file_diffs(file_entries):
+    """Return {path: (content hash, file entry)} for every parsed diff entry."""
+    return {entry["path"]: (hashlib.sha256(entry["diff"].encode('utf-8')).hexdigest(), entry)
+            for entry in file_entries}
+
+def find_matching_draft(repo_path, staged_files):
+    """Return the watch draft message if it was built from exactly these staged changes."""
+    draft = load_draft(repo_path)
+    # Drafts written before messages were schema-validated are ignored
+    if not draft.get("message") or not parse_structured_commit(draft["message"]):
+        return None
+    hashes = {path: file_hash for path, (file_hash, _) in hash_file_diffs(staged_files).items()}
+    draft_hashes = {path: info["hash"] for path, info in draft["files"].items()}
+    return draft["message"] if hashes and hashes == draft_hashes else None
+
+def _open_inotify(repo_path):
+    """Watch every tracked directory and the git dir; returns (fd, git_dir_wd) or None if unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+
+    files_result = subprocess.run(git_read_command(repo_path, 'ls-files'),
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    directories = {repo_path}
+    for path in files_result.stdout.splitlines():
+        directories.add(os.path.join(repo_path, os.path.dirname(path)))
+
+    git_dir = os.path.dirname(get_draft_path(repo_path) or "")
+    git_dir_wd = libc.inotify_add_watch(fd, os.fsencode(git_dir), WATCH_MASK) if git_dir else -1
+    for directory in directories:
+        # Usually ENOSPC: more directories than fs.inotify.max_user_watches allows
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0 or git_dir_wd < 0:
+            os.close(fd)
+            return None
+    return fd, git_dir_wd
+
+def _read_relevant_events(fd, git_dir_wd):
+    """Drain pending inotify events; True if any concerns the work tree or the index."""
+    relevant = False
+    while True:
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return relevant
+        offset = 0
+        while offset < len(data):
+            wd, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_len].rstrip(b'\0')
+            offset += EVENT_HEADER.size + name_len
+            # In the git dir only the index matters; our own draft writes must not retrigger a pass
+            if wd != git_dir_wd or name == b"index":
+                relevant = True
+
+def wait_for_change(watcher, interval):
+    """Block until the work tree or index changes (inotify) or the poll interval elapses."""
+    if watcher is None:
+        time.sleep(interval)
+        return
+    fd, git_dir_wd = watcher
+    while True:
+        readable, _, _ = select.select([fd], [], [])
+        if readable and _read_relevant_events(fd, git_dir_wd):
+            break
+    # Debounce: wait until the burst of events settles
+    while select.select([fd], [], [], DEBOUNCE_SECONDS)[0]:
+        _read_relevant_events(fd, git_dir_wd)
+
+def update_draft(repo_path, draft, args):
+    """Run one pass: re-summarize files whose diff changed and re-combine the draft if needed.
+
+    Returns the number of files that were re-summarized, or None if nothing changed.
+    """
+    # Read-only commands never refresh the index, so the pass does not trigger itself
+    diff_result = subprocess.run(git_read_command(repo_path, 'diff', 'HEAD'),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='replace')
+    if diff_result.returncode != 0:
+        return None
+    current = hash_file_diffs(split_diff_by_file(diff_result.stdout))
+
+    known = draft["files"]
+    changed = [entry for path, (file_hash, entry) in current.items()
+               if known.get(path, {}).get("hash") != file_hash]
+    removed = [path for path in known if path not in current]
+    if not changed and not removed:
+        return None
+
+    # Reverted or repeated edits hit the shared blob-pair store instead of the API
+    notes, _ = get_file_notes(changed, get_blob_pairs(repo_path, 'HEAD'), args.model, args.workers)
+    files = {path: info for path, info in known.items() if path in current}
+    for entry in changed:
+        if entry["path"] in notes:
+            files[entry["path"]] = {"hash": current[entry["path"]][0], "note": notes[entry["path"]]}
+        else:
+            files.pop(entry["path"], None) # Failed note: retried on the next pass
+
+    message = None
+    if files and len(files) == len(current):
+        branch_result = subprocess.run(git_read_command(repo_path, 'branch', '--show-current'),
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        message = combine_notes({path: info["note"] for path, info in files.items()},
+                                branch_result.stdout.strip() or "unknown", args.model, args.max_tokens)
+
+    draft.update({"files": files, "message": message, "updated": time.time()})
+    save_draft(repo_path, draft)
+    return len(changed)
+
+def main(argv):
+    """Entry point for 'gitai watch'."""
+    args = create_watch_parser().parse_args(argv)
+
+    repo_path = find_git_root()
+    if not repo_path:
+        sys.exit(1)
+    if not check_api_key():
+        sys.exit(1)
+
+    draft = load_draft(repo_path)
+    watcher = _open_inotify(repo_path)
+    mode = "inotify" if watcher else f"polling every {args.interval:g}s"
+    print(f"{Fore.CYAN}ℹ Watching {repo_path} ({mode}). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            updated = update_draft(repo_path, draft, args)
+            if updated is not None:
+                unchanged = len(draft["files"]) - updated
+                if draft["message"]:
+                    subject = parse_structured_commit(draft["message"])["full_message"].splitlines()[0]
+                    print(f"{Fore.GREEN}✓ Draft updated ({updated} re-summarized, {max(0, unchanged)} reused): "
+                          f"{Fore.WHITE}{subject}")
+                elif not draft["files"]:
+                    print(f"{Fore.YELLOW}⚠ No changes against HEAD; draft cleared.")
+                else:
+                    print(f"{Fore.RED}✗ Draft incomplete; retrying on the next change.")
+            wait_for_change(watcher, args.interval)
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}⚠ Stopped watching.")
+    finally:
+        if watcher:
+            os.close(watcher[0])
@@ -0,0 +1,21 @@
+from ai_toolkit import ai_service
+
+
+def test_check_api_key_without_key_prints_setup_hint(monkeypatch, capsys):
+    monkeypatch.setattr(ai_service, "client", None)
+    monkeypatch.setattr(ai_service, "load_config", lambda: {"api_key": ""})
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert ai_service.check_api_key() is False
+    output = capsys.readouterr().out
+    assert "API key is not configured" in output
+    assert "gitai-setup" in output
+
+
+def test_merge_usage_adds_up_calls():
+    total = {}
+    ai_service.merge_usage(total, {"prompt_tokens": 100, "cached_tokens": 64, "rate_limit_wait": 0.25})
+    ai_service.merge_usage(total, {"prompt_tokens": 50, "completion_tokens": 10})
+    assert total["prompt_tokens"] == 150
+    assert total["cached_tokens"] == 64
+    assert total["completion_tokens"] == 10
+    assert total["rate_limit_wait"] == 0.25
@@ -0,0 +1,26 @@
+import os
+import subprocess
+
+from ai_toolkit.cli import normalize_pathspec, find_staged_outside_pathspec
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-C', str(repo), *args], check=True, stdout=subprocess.PIPE)
+
+
+def test_normalize_pathspec_is_relative_to_repo_root(tmp_path, monkeypatch):
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    assert normalize_pathspec(str(tmp_path), ["app.py", "../docs", ":(glob)**/*.md"]) == \
+        [os.path.join("src", "app.py"), "docs", ":(glob)**/*.md"]
+
+
+def test_find_staged_outside_pathspec(tmp_path):
+    git(tmp_path, 'init', '-q')
+    (tmp_path / "src").mkdir()
+    for path in ("src/app.py", "src/util.py", "README.md"):
+        (tmp_path / path).write_text("x\n")
+    git(tmp_path, 'add', '.')
+    assert find_staged_outside_pathspec(str(tmp_path), ["src"]) == ["README.md"]
+    assert find_staged_outside_pathspec(str(tmp_path), [":!README.md"]) == ["README.md"]
+    assert find_staged_outside_pathspec(str(tmp_path), ["src", "README.md"]) == []
@@ -0,0 +1,37 @@
+from ai_toolkit.enrichment import changed_block_starts, enclosing_signatures, funcname_pattern
+
+
+def signatures(source, line_number, path="app.py"):
+    return enclosing_signatures(source.splitlines(), line_number, funcname_pattern(path))
+
+
+def test_nested_python_method():
+    source = "class Cache:\n    def get(self, key):\n        value = 1\n        return value\n"
+    assert signatures(source, 4) == ["class Cache", "def get(self, key)"]
+
+
+def test_top_level_statement_after_function_is_not_enclosed():
+    source = "def a():\n    return 1\n\nif True:\n    y = 2\n"
+    assert signatures(source, 5) == []
+
+
+def test_python_branch_inside_function():
+    source = "def a(x):\n    if x:\n        pass\n    else:\n        y = 2\n"
+    assert signatures(source, 5) == ["def a(x)"]
+
+
+def test_brace_language_stops_at_closing_brace():
+    source = "function a() {\n  return 1;\n}\n\nif (ready) {\n  start();\n}\n"
+    assert signatures(source, 6, "app.js") == []
+
+
+def test_c_function_with_brace_on_own_line():
+    source = "static int\nparse(const char *s)\n{\n#ifdef DEBUG\n    log(s);\n#endif\n    return 0;\n}\n"
+    assert signatures(source, 7, "parse.c") == ["parse(const char *s)"]
+
+
+def test_changed_block_starts_splits_merged_hunks():
+    diff = ("diff --git a/app.py b/app.py\n@@ -1,7 +1,7 @@\n def a():\n-    x = 1\n+    x = 2\n"
+            " \n \n def b():\n-    y = 1\n+    y = 2\n")
+    assert changed_block_starts(diff) == [2, 6]
+    assert changed_block_starts(diff, use_old_side=True) == [2, 6]
@@ -0,0 +1,64 @@
+import subprocess
+
+import pytest
+
+from ai_toolkit.git_utils import get_blob_pairs, find_changed_submodules
+from ai_toolkit.utils import split_diff_by_file
+
+
+def git(repo, *args):
+    return subprocess.run(['git', '-C', str(repo), *args], check=True,
+                          stdout=subprocess.PIPE, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    git(tmp_path, 'init', '-q')
+    (tmp_path / "keep.txt").write_text("keep\n")
+    (tmp_path / "old name.txt").write_text("same content for rename detection\n" * 5)
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-qm', 'init')
+    return tmp_path
+
+
+def test_blob_pairs_for_staged_rename_and_edit(repo):
+    git(repo, 'mv', 'old name.txt', 'new name.txt')
+    (repo / "keep.txt").write_text("changed\n")
+    git(repo, 'add', 'keep.txt')
+    pairs = get_blob_pairs(str(repo), '--cached', '-M', 'HEAD')
+    assert set(pairs) == {"keep.txt", "new name.txt"}
+    assert pairs["keep.txt"] == (git(repo, 'rev-parse', 'HEAD:keep.txt'), git(repo, 'rev-parse', ':keep.txt'))
+    assert pairs["new name.txt"][0] == git(repo, 'rev-parse', 'HEAD:old name.txt')
+
+
+def test_blob_pairs_hash_work_tree_files(repo):
+    (repo / "keep.txt").write_text("unstaged\n")
+    pairs = get_blob_pairs(str(repo), 'HEAD')
+    assert pairs["keep.txt"][1] == git(repo, 'hash-object', 'keep.txt')
+
+
+def test_blob_pairs_for_invalid_revision(repo):
+    assert get_blob_pairs(str(repo), 'no-such-ref') == {}
+
+
+def test_find_changed_submodules():
+    old, new = "a" * 40, "b" * 40
+    diff = (f"diff --git a/lib b/lib\n@@ -1 +1 @@\n-Subproject commit {old}\n+Subproject commit {new}\n"
+            f"diff --git a/vendor b/vendor\n@@ -1 +1 @@\n-Subproject commit {old}\n+Subproject commit {old}-dirty\n"
+            "diff --git a/app.py b/app.py\n@@ -1 +1 @@\n-x\n+y\n")
+    submodules = find_changed_submodules(split_diff_by_file(diff))
+    assert submodules == {
+        "lib": {"old": old, "new": new, "dirty": False},
+        "vendor": {"old": old, "new": old, "dirty": True},
+    }
+
+
+def test_find_changed_submodules_combines_staged_and_unstaged():
+    old, new = "a" * 40, "b" * 40
+    staged = f"diff --git a/lib b/lib\n@@ -1 +1 @@\n-Subproject commit {old}\n+Subproject commit {new}\n"
+    unstaged = f"diff --git a/lib b/lib\n@@ -1 +1 @@\n-Subproject commit {new}\n+Subproject commit {new}-dirty\n"
+    submodules = find_changed_submodules(split_diff_by_file(staged) + split_diff_by_file(unstaged))
+    assert submodules == {"lib": {"old": old, "new": new, "dirty": True}}
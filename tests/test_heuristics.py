@@ -0,0 +1,41 @@
+from ai_toolkit.heuristics import classify_path, generate_heuristic_message
+from ai_toolkit.utils import split_diff_by_file
+
+
+def changes_for(diff_text):
+    return {"staged": diff_text, "unstaged": "", "staged_files": split_diff_by_file(diff_text),
+            "unstaged_files": [], "has_staged": True, "has_unstaged": False}
+
+
+def test_classify_path():
+    assert classify_path("tests/test_app.py") == "test"
+    assert classify_path("src/app.test.ts") == "test"
+    assert classify_path("docs/guide.md") == "docs"
+    assert classify_path("README.md") == "docs"
+    assert classify_path(".github/workflows/ci.yml") == "ci"
+    assert classify_path("requirements.txt") == "deps"
+    assert classify_path("ai_toolkit/cli.py") == "code"
+
+
+def test_added_function_becomes_feat():
+    diff = ("diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1,2 +1,4 @@\n"
+            " import os\n+def load_config(path):\n+    return path\n")
+    message = generate_heuristic_message({}, changes_for(diff))
+    assert message.startswith("feat: Add load_config\n\n- app.py (modified, +2/-0)")
+
+
+def test_docs_only_change():
+    diff = "diff --git a/README.md b/README.md\n--- a/README.md\n+++ b/README.md\n@@ -1 +1 @@\n-Old\n+New\n"
+    assert generate_heuristic_message({}, changes_for(diff)) == "docs: Update README.md"
+
+
+def test_dependency_files_use_deps_scope():
+    diff = "diff --git a/requirements.txt b/requirements.txt\n@@ -1 +1 @@\n-openai==1.0\n+openai==1.2\n"
+    assert generate_heuristic_message({}, changes_for(diff)) == "chore(deps): Update requirements.txt"
+
+
+def test_falls_back_to_changed_files_without_a_diff():
+    changes = changes_for("")
+    changes["has_staged"] = False
+    message = generate_heuristic_message({"changed_files": ["tests/test_a.py", "tests/test_b.py"]}, changes)
+    assert message.startswith("test: Update tests/")
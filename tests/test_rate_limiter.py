@@ -0,0 +1,30 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_toolkit import rate_limiter
+
+
+def use_temp_limiter(monkeypatch, tmp_path):
+    monkeypatch.setattr(rate_limiter, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(rate_limiter, "LIMITER_DB", tmp_path / "ratelimit.sqlite3")
+
+
+def test_burst_within_budget_does_not_wait(monkeypatch, tmp_path):
+    use_temp_limiter(monkeypatch, tmp_path)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=60) as executor:
+        waits = list(executor.map(lambda _: rate_limiter.acquire(100, 60, 0), range(60)))
+    assert max(waits) < 1.0
+    assert time.monotonic() - started < 3.0
+
+
+def test_caller_past_budget_waits_for_refill(monkeypatch, tmp_path):
+    use_temp_limiter(monkeypatch, tmp_path)
+    rate_limiter.acquire(100, 60, 0)
+    conn = rate_limiter._connect()
+    conn.execute("UPDATE bucket SET requests = 0")
+    conn.close()
+    notified = []
+    wait = rate_limiter.acquire(100, 60, 0, on_wait=lambda: notified.append(True))
+    assert 0.5 < wait < 2.0
+    assert notified == [True]
@@ -0,0 +1,39 @@
+from ai_toolkit.routing import parse_tiers, score_complexity, route_model
+from ai_toolkit.utils import split_diff_by_file
+
+
+def changes_for(staged="", unstaged=""):
+    return {"staged": staged, "unstaged": unstaged, "staged_files": split_diff_by_file(staged),
+            "unstaged_files": split_diff_by_file(unstaged), "has_staged": bool(staged),
+            "has_unstaged": bool(unstaged)}
+
+
+def test_parse_tiers_resolves_defaults_and_sorts():
+    tiers = parse_tiers("large:gpt-4.1:default:0, small:default:150:10, broken:x", "gpt-4.1-mini", 300)
+    assert [tier["name"] for tier in tiers] == ["small", "large"]
+    assert tiers[0]["model"] == "gpt-4.1-mini"
+    assert tiers[0]["max_tokens"] == 150
+    assert tiers[1]["max_tokens"] == 300
+    assert tiers[1]["max_score"] == float('inf')
+
+
+def test_parse_tiers_skips_invalid_numbers():
+    assert parse_tiers("a:m:lots:10", "m", 300) == []
+
+
+def test_score_counts_files_hunks_and_languages_across_diffs():
+    staged = "diff --git a/a.py b/a.py\n@@ -1 +1 @@\n-x\n+y\n@@ -9 +9 @@\n-z\n+w\n"
+    unstaged = "diff --git a/b.js b/b.js\n@@ -1 +1 @@\n-x\n+y\n"
+    complexity = score_complexity({}, changes_for(staged, unstaged))
+    assert complexity["files"] == 2
+    assert complexity["hunks"] == 3
+    assert complexity["languages"] == 2
+
+
+def test_route_model_picks_first_covering_tier():
+    tiers = parse_tiers("small:mini:100:10,large:big:500:0", "mini", 300)
+    small = route_model({}, changes_for("diff --git a/a.py b/a.py\n@@ -1 +1 @@\n-x\n+y\n"), tiers)
+    assert small["name"] == "small"
+    many = "".join(f"diff --git a/f{i}.py b/f{i}.py\n@@ -1 +1 @@\n-x\n+y\n" for i in range(10))
+    assert route_model({}, changes_for(many), tiers)["name"] == "large"
+    assert route_model({}, changes_for(many), []) is None
@@ -0,0 +1,77 @@
+import json
+
+from ai_toolkit.utils import parse_structured_commit, parse_commit_message, create_diff_prompt, estimate_tokens, \
+    split_diff_by_file, COMMIT_SYSTEM_PROMPT
+
+
+def reply(**overrides):
+    data = {"type": "fix", "scope": "", "subject": "Handle empty diff", "body": "", "breaking": False}
+    data.update(overrides)
+    return json.dumps(data)
+
+
+def test_structured_commit_builds_prefix_and_message():
+    parsed = parse_structured_commit(reply(type="feat", scope="api", body="Needed by clients.", breaking=True))
+    assert parsed["prefix"] == "feat(api)!"
+    assert parsed["title"] == "Handle empty diff"
+    assert parsed["full_message"] == "feat(api)!: Handle empty diff\n\nNeeded by clients."
+
+
+def test_structured_commit_without_scope_or_body():
+    parsed = parse_structured_commit(reply())
+    assert parsed["prefix"] == "fix"
+    assert parsed["full_message"] == "fix: Handle empty diff"
+
+
+def test_structured_commit_strips_code_fences():
+    assert parse_structured_commit("```json\n" + reply() + "\n```")["type"] == "fix"
+
+
+def test_structured_commit_rejects_truncated_json():
+    assert parse_structured_commit('{"type":"fix","scope":"app","subject":"Tweak') is None
+
+
+def test_structured_commit_rejects_invalid_fields():
+    assert parse_structured_commit(reply(type="bogus")) is None
+    assert parse_structured_commit(reply(subject="  ")) is None
+    assert parse_structured_commit(reply(breaking="no")) is None
+    assert parse_structured_commit("fix: Handle empty diff") is None
+
+
+def test_structured_commit_matches_free_text_parser():
+    parsed = parse_structured_commit(reply(scope="core", body="Why.", breaking=True))
+    reparsed = parse_commit_message(parsed["full_message"])
+    for key in ("title", "body", "type", "prefix", "scope", "breaking"):
+        assert reparsed[key] == parsed[key]
+
+
+def test_system_prompt_is_a_cacheable_static_prefix():
+    context = {"branch": "main", "changed_files": ["a.py"], "file_types": {".py": 1}, "stats": " a.py | 1 +"}
+    first = create_diff_prompt(context, {"has_staged": True, "staged": "+x\n", "has_unstaged": False})
+    second = create_diff_prompt(dict(context, branch="dev"), {"has_staged": True, "staged": "+y\n",
+                                                              "has_unstaged": False})
+    assert first[0] == second[0] == COMMIT_SYSTEM_PROMPT
+    # OpenAI caches prefixes of 1024+ tokens; keep a margin because estimate_tokens is approximate
+    assert estimate_tokens(COMMIT_SYSTEM_PROMPT) >= 1280
+
+
+def test_split_diff_by_file_counts_and_statuses():
+    diff = ("diff --git a/app.py b/app.py\nindex 1..2 100644\n--- a/app.py\n+++ b/app.py\n"
+            "@@ -1,2 +1,2 @@\n-old\n+new\n+more\n context\n"
+            "diff --git a/new.txt b/new.txt\nnew file mode 100644\n--- /dev/null\n+++ b/new.txt\n@@ -0,0 +1 @@\n+hi\n"
+            "diff --git a/gone.txt b/gone.txt\ndeleted file mode 100644\n--- a/gone.txt\n+++ /dev/null\n@@ -1 +0,0 @@\n-bye\n"
+            "diff --git a/old name.py b/new name.py\nsimilarity index 100%\nrename from old name.py\nrename to new name.py\n")
+    files = split_diff_by_file(diff)
+    assert [(f["path"], f["status"]) for f in files] == [
+        ("app.py", "modified"), ("new.txt", "added"), ("gone.txt", "deleted"), ("new name.py", "renamed")]
+    assert (files[0]["hunks"], files[0]["added"], files[0]["removed"]) == (1, 2, 1)
+    assert files[0]["added_lines"] == ["new", "more"]
+    assert files[3]["old_path"] == "old name.py"
+    # Header lines like '--- a/app.py' are not counted as removals
+    assert files[2]["removed"] == 1
+    assert "".join(f["diff"] for f in files) == diff
+
+
+def test_split_diff_by_file_ignores_text_before_first_file():
+    assert split_diff_by_file("") == []
+    assert split_diff_by_file("warning: something\n") == []